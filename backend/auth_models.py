@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from email_validator import validate_email, EmailNotValidError
-from typing import Optional
+from utils.email_utils import is_valid_email
+from typing import List, Optional
 from datetime import datetime
 
 # Request models
@@ -9,12 +9,9 @@ class UserRegister(BaseModel):
     email: str
     password: str
     
-    def validate_email_format(self):
-        try:
-            validate_email(self.email)
-            return True
-        except EmailNotValidError:
-            return False
+    def validate_email_format(self, check_deliverability: Optional[bool] = None):
+        # Syntax-only by default; the DNS check is opt-in and cached per domain
+        return is_valid_email(self.email, check_deliverability)
     
     def validate_password(self):
         # Check password length (bcrypt has 72 byte limit)
@@ -54,4 +51,17 @@ class LoginResponse(BaseModel):
     user: UserResponse
 
 class MessageResponse(BaseModel):
-    message: str
\ No newline at end of file
+    message: str
+
+class BulkImportRowResult(BaseModel):
+    row: int
+    username: Optional[str] = None
+    status: str  # created, valid (dry run), conflict, invalid
+    detail: Optional[str] = None
+
+class BulkImportResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    dry_run: bool
+    results: List[BulkImportRowResult]
\ No newline at end of file
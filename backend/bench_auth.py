@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark the authentication hot path
+
+Measures password hashing, password verification, token creation, token
+verification and the get_current_active_user dependency chain in isolation,
+then /api/auth/profile and /api/auth/login end-to-end through the ASGI app
+under concurrency. Runs against a throwaway local SQLite database.
+
+Usage:
+    python bench_auth.py
+    python bench_auth.py --bcrypt-rounds 10 --concurrency 50
+    python bench_auth.py --save-baseline
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Auth hot-path micro-benchmarks")
+    parser.add_argument("--iterations", type=int, default=200, help="Iterations for the fast benchmarks")
+    parser.add_argument("--hash-iterations", type=int, default=10, help="Iterations for bcrypt benchmarks")
+    parser.add_argument("--requests", type=int, default=500, help="Requests for the end-to-end profile benchmark")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight for end-to-end benchmarks")
+    parser.add_argument("--bcrypt-rounds", type=int, help="Override BCRYPT_ROUNDS")
+    parser.add_argument("--baseline", default="bench_auth_baseline.json", help="Baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--fail-threshold", type=float, default=0.2, help="Exit non-zero if ops/sec drops by more than this fraction")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    # Configure before the app modules read their settings at import time
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_auth_"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["LOGIN_MAX_ATTEMPTS_PER_USERNAME"] = str(10 ** 9)
+    os.environ["LOGIN_MAX_ATTEMPTS_PER_IP"] = str(10 ** 9)
+    # Admit every in-flight login; a fast 503 from the verification cap is not a login
+    os.environ["LOGIN_MAX_CONCURRENT_VERIFICATIONS"] = str(max(args.concurrency, os.cpu_count() or 1))
+    if args.bcrypt_rounds:
+        os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+
+    import httpx
+    from fastapi.security import HTTPAuthorizationCredentials
+    from database import SessionLocal, User, create_tables
+    from utils import auth_utils
+    from bench_common import time_sync, time_concurrent, print_results, save_results, compare_to_baseline
+
+    print(f"🚀 Auth benchmarks (bcrypt rounds: {auth_utils.BCRYPT_ROUNDS}, db: {db_path})")
+    create_tables()
+
+    password = "benchmark-password"
+    hashed = auth_utils.get_password_hash(password)
+    db = SessionLocal()
+    db.add(User(username="bench_user", email="bench@example.com", hashed_password=hashed))
+    db.commit()
+
+    token = auth_utils.create_access_token({"sub": "bench_user"})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    from database import AsyncSessionLocal
+    loop = asyncio.new_event_loop()
+
+    async def resolve_user():
+        async with AsyncSessionLocal() as async_db:
+            token_data = auth_utils.verify_token(credentials)
+            user = await auth_utils.get_current_user(token_data, async_db)
+            return auth_utils.get_current_active_user(user)
+
+    def dependency_chain():
+        return loop.run_until_complete(resolve_user())
+
+    results = [
+        time_sync("get_password_hash", lambda: auth_utils.get_password_hash(password), args.hash_iterations),
+        time_sync("verify_password", lambda: auth_utils.verify_password(password, hashed), args.hash_iterations),
+        time_sync("create_access_token", lambda: auth_utils.create_access_token({"sub": "bench_user"}), args.iterations),
+        time_sync("verify_token", lambda: auth_utils.verify_token(credentials), args.iterations),
+        time_sync("get_current_active_user chain", dependency_chain, args.iterations),
+    ]
+    db.close()
+    loop.close()
+
+    from main import app
+
+    async def end_to_end():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            headers = {"Authorization": f"Bearer {token}"}
+
+            async def profile():
+                response = await client.get("/api/auth/profile", headers=headers)
+                assert response.status_code == 200, response.text
+
+            async def login():
+                response = await client.post("/api/auth/login", json={"username": "bench_user", "password": password})
+                assert response.status_code == 200, response.text
+
+            return [
+                await time_concurrent(f"GET /api/auth/profile (c={args.concurrency})", profile, args.requests, args.concurrency),
+                await time_concurrent(f"POST /api/auth/login (c={args.concurrency})", login, args.hash_iterations * 2, args.concurrency),
+            ]
+
+    results += asyncio.run(end_to_end())
+
+    print()
+    print_results(results)
+    regressions = compare_to_baseline(args.baseline, results, args.fail_threshold)
+
+    if args.save_baseline:
+        save_results(args.baseline, results, {"bcrypt_rounds": auth_utils.BCRYPT_ROUNDS})
+
+    if regressions:
+        print(f"\n❌ Throughput regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Shared helpers for the bench_*.py benchmark scripts
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import time
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def summarize(name, durations, wall_time=None):
+    """Turn per-operation durations (seconds) into ops/sec and latency percentiles"""
+    wall_time = wall_time if wall_time is not None else sum(durations)
+    return {
+        "name": name,
+        "ops": len(durations),
+        "ops_per_sec": round(len(durations) / wall_time, 2) if wall_time else 0.0,
+        "mean_ms": round(statistics.mean(durations) * 1000, 3) if durations else 0.0,
+        "p50_ms": round(percentile(durations, 50) * 1000, 3),
+        "p99_ms": round(percentile(durations, 99) * 1000, 3),
+    }
+
+def time_sync(name, func, iterations, warmup=1):
+    """Time a synchronous callable `iterations` times"""
+    for _ in range(warmup):
+        func()
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return summarize(name, durations)
+
+async def time_concurrent(name, coro_factory, total, concurrency, warmup=1):
+    """Run `total` calls of an async callable with at most `concurrency` in flight"""
+    for _ in range(warmup):
+        await coro_factory()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    durations = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await coro_factory()
+            durations.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return summarize(name, durations, time.perf_counter() - start)
+
+def print_results(results):
+    print(f"{'benchmark':<40} {'ops':>6} {'ops/sec':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    print("-" * 80)
+    for r in results:
+        print(f"{r['name']:<40} {r['ops']:>6} {r['ops_per_sec']:>10} {r['p50_ms']:>10} {r['p99_ms']:>10}")
+
+def save_results(path, results, meta=None):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta or {}, "results": results}, f, indent=2)
+    print(f"💾 Saved results to {path}")
+
+def compare_to_baseline(path, results, threshold=0.2):
+    """
+    Print the change in ops/sec and p99 against a saved baseline.
+
+    Returns the names of benchmarks whose throughput dropped by more than
+    `threshold` (a fraction).
+    """
+    if not os.path.exists(path):
+        print(f"ℹ️  No baseline at {path} (run with --save-baseline to create one)")
+        return []
+
+    with open(path, encoding="utf-8") as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+
+    regressions = []
+    print(f"\n📊 Compared to baseline {path}:")
+    for r in results:
+        base = baseline.get(r["name"])
+        if not base or not base["ops_per_sec"]:
+            print(f"   {r['name']:<40} (no baseline)")
+            continue
+        change = (r["ops_per_sec"] - base["ops_per_sec"]) / base["ops_per_sec"]
+        p99_change = r["p99_ms"] - base["p99_ms"]
+        marker = "❌" if change < -threshold else "✅"
+        print(f"   {marker} {r['name']:<38} ops/sec {change:+.1%}   p99 {p99_change:+.3f} ms")
+        if change < -threshold:
+            regressions.append(r["name"])
+    return regressions
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark request concurrency against a slow database
+
+Runs the same query under concurrent load three ways: the sync session
+called straight from a coroutine (how the controllers used to work), the
+sync session on the bounded database threadpool, and the async session. A
+sleep_ms() SQL function stands in for a slow MySQL round trip, and a
+heartbeat task measures how long the event loop is stalled meanwhile.
+
+Usage:
+    python bench_db_concurrency.py
+    python bench_db_concurrency.py --query-ms 50 --concurrency 20 --requests 200
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Database concurrency benchmark")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per strategy")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight")
+    parser.add_argument("--query-ms", type=int, default=20, help="Simulated database latency per query")
+    return parser.parse_args()
+
+def sleep_ms(ms):
+    time.sleep(ms / 1000)
+    return ms
+
+async def measure_loop_lag(stop, interval=0.005):
+    """Record how late each heartbeat wakes up; large values mean the loop was blocked"""
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+    return lags
+
+def main():
+    args = parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_concurrency_"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("DB_THREADPOOL_SIZE", str(args.concurrency))
+
+    from sqlalchemy import event, text
+    from database import SessionLocal, AsyncSessionLocal, User, create_tables, engine, get_async_engine, run_in_db_thread
+    from bench_common import time_concurrent, print_results, percentile
+
+    async_engine = get_async_engine()
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "connect", lambda conn, record: conn.create_function("sleep_ms", 1, sleep_ms))
+    create_tables()
+
+    db = SessionLocal()
+    db.add(User(username="bench_user", email="bench@example.com", hashed_password="x"))
+    db.commit()
+    db.close()
+
+    query = text("SELECT sleep_ms(:ms), count(*) FROM quiz_attempts WHERE user_id = 1")
+    params = {"ms": args.query_ms}
+
+    def sync_query():
+        db = SessionLocal()
+        try:
+            return db.execute(query, params).all()
+        finally:
+            db.close()
+
+    async def blocking():
+        sync_query()
+
+    async def threadpool():
+        await run_in_db_thread(sync_query)
+
+    async def async_session():
+        async with AsyncSessionLocal() as db:
+            (await db.execute(query, params)).all()
+
+    async def run():
+        results, lags = [], {}
+        for name, handler in (
+            ("sync session on event loop", blocking),
+            ("sync session in db threadpool", threadpool),
+            ("async session", async_session),
+        ):
+            stop = asyncio.Event()
+            heartbeat = asyncio.create_task(measure_loop_lag(stop))
+            results.append(await time_concurrent(
+                f"{name} (c={args.concurrency})", handler, args.requests, args.concurrency
+            ))
+            stop.set()
+            lags[results[-1]["name"]] = await heartbeat
+        await async_engine.dispose()
+        return results, lags
+
+    print(f"🚀 {args.requests} requests, {args.concurrency} in flight, {args.query_ms} ms per query")
+    results, lags = asyncio.run(run())
+
+    print()
+    print_results(results)
+    print()
+    for r in results:
+        lag = lags[r["name"]]
+        print(f"⏱️  {r['name']:<40} event loop lag p99 {percentile(lag, 99) * 1000:.1f} ms, max {max(lag or [0]) * 1000:.1f} ms")
+    print()
+    blocking_ops = results[0]["ops_per_sec"]
+    for r in results[1:]:
+        print(f"⚡ {r['name']} serves {r['ops_per_sec'] / blocking_ops:.1f}x the requests per second")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark response body formats and compression
+
+For a completed /api/quiz/{id} response and a /api/generate-questions
+response (20 questions each by default), reports bytes on the wire and
+encode cost for JSON and MessagePack, each raw and with gzip / brotli at
+several levels. Then fetches /api/quiz/{id} through the app with each
+Accept-Encoding to include the middleware. MessagePack and brotli rows are
+skipped when msgpack / brotli aren't installed.
+
+Usage:
+    python bench_encoding.py
+    python bench_encoding.py --questions 20 --iterations 500
+"""
+
+import argparse
+import gzip
+import os
+import tempfile
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Response encoding benchmark")
+    parser.add_argument("--questions", type=int, default=20, help="Questions per payload")
+    parser.add_argument("--iterations", type=int, default=300, help="Timed iterations per encoding")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_encoding_"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from fastapi.testclient import TestClient
+    from database import SessionLocal, User, create_tables
+    from models import GenerateQuestionsResponse
+    from utils.auth_utils import create_access_token
+    from utils.compression import brotli
+    from utils.fast_json import dumps_bytes
+    from utils.negotiation import msgpack
+    from bench_common import time_sync
+
+    questions = [
+        {"question": f"Sample question {i} about a reasonably long topic, with some detail?",
+         "options": [f"{c}) Option {c} for question {i}, phrased as a full sentence" for c in "ABCD"]}
+        for i in range(args.questions)
+    ]
+    answers = [{"question_index": i, "user_answer": "A", "correct_answer": "B", "is_correct": i % 2 == 0}
+               for i in range(args.questions)]
+
+    create_tables()
+    db = SessionLocal()
+    db.add(User(username="bench_user", email="bench@example.com", hashed_password="x"))
+    db.commit()
+    db.close()
+
+    client = TestClient(__import__("main").app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "bench_user"})}
+    quiz_id = client.post("/api/quiz/start", headers=headers, json={
+        "topic": "Benchmarks", "total_questions": args.questions, "questions_data": questions
+    }).json()["id"]
+    client.put(f"/api/quiz/{quiz_id}/complete", headers=headers, json={
+        "answers": answers, "score": args.questions // 2, "total_questions": args.questions
+    })
+
+    payloads = {
+        "/api/quiz/{id}": client.get(f"/api/quiz/{quiz_id}", headers={**headers, "Accept-Encoding": "identity"}).json(),
+        "/api/generate-questions": GenerateQuestionsResponse(questions=questions).model_dump(mode="json"),
+    }
+
+    formats = [("json", dumps_bytes)]
+    if msgpack is not None:
+        formats.append(("msgpack", msgpack.packb))
+    compressions = [("raw", lambda b: b)]
+    compressions += [(f"gzip-{level}", lambda b, level=level: gzip.compress(b, level)) for level in (1, 6, 9)]
+    if brotli is not None:
+        compressions += [(f"br-{q}", lambda b, q=q: brotli.compress(b, quality=q)) for q in (1, 4, 11)]
+
+    for path, payload in payloads.items():
+        print(f"\n📦 {path} ({args.questions} questions)")
+        print(f"{'encoding':<22} {'bytes':>8} {'vs json':>8} {'encode p50 us':>14}")
+        print("-" * 56)
+        json_bytes = len(dumps_bytes(payload))
+        for fmt_name, encode in formats:
+            for comp_name, compress in compressions:
+                body = compress(encode(payload))
+                timing = time_sync(fmt_name, lambda: compress(encode(payload)), args.iterations)
+                print(f"{fmt_name + ' ' + comp_name:<22} {len(body):>8} {len(body) / json_bytes:>8.0%} "
+                      f"{timing['p50_ms'] * 1000:>14.1f}")
+
+    print(f"\n🌐 GET /api/quiz/{{id}} through the app")
+    print(f"{'request':<34} {'bytes':>8} {'p50 ms':>8}")
+    print("-" * 52)
+    variants = [("json", {}), ("json gzip", {"Accept-Encoding": "gzip"})]
+    if brotli is not None:
+        variants.append(("json br", {"Accept-Encoding": "br"}))
+    if msgpack is not None:
+        variants += [
+            ("msgpack", {"Accept": "application/msgpack"}),
+            ("msgpack gzip", {"Accept": "application/msgpack", "Accept-Encoding": "gzip"}),
+        ]
+    for name, extra in variants:
+        request_headers = {**headers, "Accept-Encoding": "identity", **extra}
+
+        def fetch():
+            with client.stream("GET", f"/api/quiz/{quiz_id}", headers=request_headers) as response:
+                return b"".join(response.iter_raw())
+
+        timing = time_sync(name, fetch, args.iterations // 3 or 1)
+        print(f"{name:<34} {len(fetch()):>8} {timing['p50_ms']:>8.3f}")
+
+if __name__ == "__main__":
+    main()
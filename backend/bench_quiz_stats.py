@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark quiz statistics for a heavy user
+
+Seeds a throwaway SQLite database with one user owning many quiz attempts
+(with realistic questions/answers payloads), then compares the legacy
+load-everything stats computation, the single aggregate query used to
+rebuild the summary table, and QuizController.get_user_quiz_stats which
+reads the summary table.
+
+Usage:
+    python bench_quiz_stats.py
+    python bench_quiz_stats.py --attempts 50000 --iterations 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Quiz stats benchmark")
+    parser.add_argument("--attempts", type=int, default=10000, help="Quiz attempts to seed for the user")
+    parser.add_argument("--questions", type=int, default=20, help="Questions per attempt")
+    parser.add_argument("--iterations", type=int, default=10, help="Timed iterations per implementation")
+    return parser.parse_args()
+
+def seed(db, user_id, attempts, questions):
+    from sqlalchemy import insert
+    from database import QuizAttempt
+
+    questions_data = json.dumps([
+        {"question": f"Sample question {i} about a reasonably long topic?",
+         "options": [f"Option {c} for question {i}" for c in "ABCD"]}
+        for i in range(questions)
+    ])
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(attempts):
+        completed = random.random() < 0.8
+        score = random.randint(0, questions) if completed else None
+        rows.append({
+            "user_id": user_id,
+            "topic": f"Topic {i % 50}",
+            "total_questions": questions,
+            "questions_json": questions_data,
+            "answers": json.dumps([{"question_index": q, "user_answer": "A", "is_correct": q < (score or 0)}
+                                   for q in range(questions)]) if completed else None,
+            "score": score,
+            "percentage": score / questions * 100 if completed else None,
+            "status": "completed" if completed else "incomplete",
+            "created_at": now - timedelta(minutes=i),
+            "completed_at": now - timedelta(minutes=i) if completed else None,
+        })
+    for start in range(0, len(rows), 1000):
+        db.execute(insert(QuizAttempt), rows[start:start + 1000])
+    db.commit()
+
+def legacy_stats(db, user_id):
+    """The previous implementation: two counts plus loading every completed row"""
+    from database import QuizAttempt
+
+    total = db.query(QuizAttempt).filter(QuizAttempt.user_id == user_id).count()
+    completed = db.query(QuizAttempt).filter(QuizAttempt.user_id == user_id, QuizAttempt.status == "completed").count()
+    attempts = db.query(QuizAttempt).filter(QuizAttempt.user_id == user_id, QuizAttempt.status == "completed").all()
+    scores = [a.score for a in attempts]
+    percentages = [a.percentage for a in attempts]
+    db.expunge_all()
+    return {
+        "total_quizzes": total,
+        "completed_quizzes": completed,
+        "incomplete_quizzes": total - completed,
+        "average_score": round(sum(scores) / len(scores), 2) if scores else 0,
+        "highest_score": max(scores) if scores else 0,
+        "lowest_score": min(scores) if scores else 0,
+        "average_percentage": round(sum(percentages) / len(percentages), 2) if percentages else 0,
+    }
+
+def main():
+    args = parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_stats_"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from database import SessionLocal, AsyncSessionLocal, User, create_tables
+    from controllers.quiz_controller import QuizController
+    from utils.quiz_stats import compute_user_stats
+    from bench_common import time_sync, print_results
+
+    create_tables()
+    db = SessionLocal()
+    user = User(username="heavy_user", email="heavy@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+
+    print(f"🌱 Seeding {args.attempts} attempts...")
+    seed(db, user.id, args.attempts, args.questions)
+    print(f"📁 Database size: {os.path.getsize(db_path) / 1024 / 1024:.1f} MB")
+
+    controller = QuizController()
+    loop = asyncio.new_event_loop()
+
+    async def read_summary():
+        async with AsyncSessionLocal() as async_db:
+            return (await controller.get_user_quiz_stats(user, async_db)).model_dump()
+
+    def current():
+        return loop.run_until_complete(read_summary())
+
+    old, new = legacy_stats(db, user.id), current()
+    if old != new:
+        print(f"❌ Results differ!\n   legacy:    {old}\n   aggregate: {new}")
+    else:
+        print(f"✅ Results match: {new}")
+
+    results = [
+        time_sync(f"legacy stats ({args.attempts} attempts)", lambda: legacy_stats(db, user.id), args.iterations),
+        time_sync(f"aggregate query ({args.attempts} attempts)", lambda: compute_user_stats(db, user.id), args.iterations),
+        time_sync(f"summary table ({args.attempts} attempts)", current, args.iterations),
+    ]
+    db.close()
+    loop.close()
+
+    print()
+    print_results(results)
+    print()
+    legacy_ops = results[0]["ops_per_sec"]
+    for r in results[1:]:
+        print(f"⚡ {r['name']} is {r['ops_per_sec'] / legacy_ops:.1f}x faster than legacy")
+
+if __name__ == "__main__":
+    main()
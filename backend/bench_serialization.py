@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark response and JSON column serialization
+
+Seeds a throwaway SQLite database with one user's quiz attempts, then times:
+- a 100-row /recent page serialized the old way (a pydantic model per row,
+  response_model validation, stdlib json) against the direct row path
+  rendered by FastJSONResponse, with and without the heavy JSON fields
+- GET /api/quiz/recent?limit=100 end to end
+- encoding the questions_data / answers JSON columns with json vs fast_json
+
+Usage:
+    python bench_serialization.py
+    python bench_serialization.py --rows 100 --questions 20 --iterations 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serialization benchmark")
+    parser.add_argument("--rows", type=int, default=100, help="Rows per /recent page")
+    parser.add_argument("--questions", type=int, default=20, help="Questions per attempt")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed iterations per benchmark")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_serialization_"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from fastapi.responses import JSONResponse
+    from fastapi.testclient import TestClient
+    from sqlalchemy import select
+    from database import AsyncSessionLocal, SessionLocal, User, create_tables
+    from quiz_models import QuizAttemptSummary, RecentQuizResponse
+    from controllers.quiz_controller import SUMMARY_COLUMNS, HEAVY_FIELDS, QuizAttempt, QuestionSet
+    from utils.auth_utils import create_access_token
+    from utils.fast_json import FastJSONResponse, dumps, orjson
+    from utils.quiz_stats import get_user_stats, to_stats_response
+    from bench_common import time_sync, print_results
+    from bench_quiz_stats import seed
+
+    create_tables()
+    db = SessionLocal()
+    user = User(username="bench_user", email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    seed(db, user.id, args.rows, args.questions)
+    stats = to_stats_response(get_user_stats(db, user.id))
+
+    def fetch(heavy):
+        columns = SUMMARY_COLUMNS + (tuple(HEAVY_FIELDS.values()) if heavy else ())
+        query = select(*columns).select_from(QuizAttempt)
+        if heavy:
+            query = query.outerjoin(QuestionSet, QuizAttempt.question_set_id == QuestionSet.id)
+        return db.execute(query.where(QuizAttempt.user_id == user.id).limit(args.rows)).all()
+
+    def legacy(rows):
+        # What the route did before: a model per row, then response_model
+        # validation and serialization, then stdlib json
+        page = RecentQuizResponse(quizzes=[QuizAttemptSummary(**row._mapping) for row in rows], stats=stats)
+        content = RecentQuizResponse.model_validate(page).model_dump(mode="json", exclude_unset=True)
+        return JSONResponse(content).body
+
+    def direct(rows):
+        return FastJSONResponse({
+            "quizzes": [dict(row._mapping) for row in rows],
+            "stats": stats.model_dump(),
+            "next_cursor": None,
+        }).body
+
+    print(f"🚀 /recent page of {args.rows} rows, {args.questions} questions each"
+          f" ({'orjson' if orjson else 'stdlib json fallback'})")
+    results = []
+    for heavy in (False, True):
+        rows = fetch(heavy)
+        old, new = json.loads(legacy(rows)), json.loads(direct(rows))
+        old.setdefault("next_cursor", None)
+        if old != new:
+            print(f"❌ Responses differ ({'with' if heavy else 'without'} heavy fields)")
+        label = "+ heavy fields" if heavy else "summary"
+        results.append(time_sync(f"models + json ({label})", lambda: legacy(rows), args.iterations))
+        results.append(time_sync(f"direct rows + orjson ({label})", lambda: direct(rows), args.iterations))
+
+    client = TestClient(__import__("main").app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": user.username})}
+    for query in ("", "&fields=questions_data,answers"):
+        url = f"/api/quiz/recent?limit={min(args.rows, 100)}{query}"
+        results.append(time_sync(f"GET /recent{' + heavy fields' if query else ''}",
+                                 lambda: client.get(url, headers=headers), args.iterations // 4 or 1))
+
+    questions = [{"question": f"Sample question {i}?", "options": [f"Option {c}" for c in "ABCD"]}
+                 for i in range(args.questions)]
+    answers = [{"question_index": i, "user_answer": "A", "is_correct": i % 2 == 0} for i in range(args.questions)]
+    column_iterations = args.iterations * 20
+    results += [
+        time_sync("json.dumps questions (canonical)",
+                  lambda: json.dumps(questions, sort_keys=True, separators=(",", ":"), ensure_ascii=False),
+                  column_iterations),
+        time_sync("fast_json.dumps questions (canonical)", lambda: dumps(questions, sort_keys=True), column_iterations),
+        time_sync("json.dumps answers", lambda: json.dumps(answers), column_iterations),
+        time_sync("fast_json.dumps answers", lambda: dumps(answers), column_iterations),
+    ]
+    db.close()
+
+    print()
+    print_results(results)
+    print()
+    for old, new in ((0, 1), (2, 3), (6, 7), (8, 9)):
+        print(f"⚡ {results[new]['name']} is {results[new]['ops_per_sec'] / results[old]['ops_per_sec']:.1f}x "
+              f"{results[old]['name']}")
+
+if __name__ == "__main__":
+    main()
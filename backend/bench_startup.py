@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark application startup
+
+Each measurement runs in a fresh interpreter, as a worker spawn or a test
+run would:
+- `import main`
+- `import main` plus the lifespan startup and the first request
+- `import utils.auth_utils` (what most scripts and tests pull in)
+Then lists the slowest imports under `main` from `python -X importtime`.
+Runs against a throwaway SQLite database.
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py --runs 20 --top 15
+    python bench_startup.py --save-baseline
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+FIRST_REQUEST = (
+    "from fastapi.testclient import TestClient\n"
+    "import main\n"
+    "with TestClient(main.app) as client:\n"
+    "    assert client.get('/').status_code == 200\n"
+)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Startup and import-time benchmark")
+    parser.add_argument("--runs", type=int, default=10, help="Interpreter launches per benchmark")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    parser.add_argument("--baseline", default="bench_startup_baseline.json", help="Baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--fail-threshold", type=float, default=0.2, help="Exit non-zero if launches/sec drops by more than this fraction")
+    return parser.parse_args()
+
+def run_python(code, env, extra_args=()):
+    return subprocess.run(
+        [sys.executable, *extra_args, "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        capture_output=True, text=True, check=True
+    )
+
+def time_launches(name, code, env, runs):
+    from bench_common import summarize
+    run_python(code, env)  # warm the filesystem and bytecode caches
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run_python(code, env)
+        durations.append(time.perf_counter() - start)
+    return summarize(name, durations)
+
+def slowest_imports(env, top):
+    """(cumulative ms, module) for the slowest imports under main"""
+    stderr = run_python("import main", env, ("-X", "importtime")).stderr
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            timings.append((int(cumulative) / 1000, module.rstrip()))
+    return sorted(timings, reverse=True)[1:top + 1]  # [0] is main itself
+
+def main():
+    args = parse_args()
+    from bench_common import print_results, save_results, compare_to_baseline
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_startup_"), "bench.db")
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}"}
+
+    print(f"🚀 Startup benchmarks ({args.runs} launches each, db: {db_path})")
+    results = [
+        time_launches("python (empty interpreter)", "pass", env, args.runs),
+        time_launches("import main", "import main", env, args.runs),
+        time_launches("import main + startup + first request", FIRST_REQUEST, env, args.runs),
+        time_launches("import utils.auth_utils", "import utils.auth_utils", env, args.runs),
+    ]
+
+    print()
+    print_results(results)
+
+    print(f"\n🐢 Slowest imports under main (cumulative):")
+    for ms, module in slowest_imports(env, args.top):
+        print(f"   {ms:>8.1f} ms  {module}")
+
+    regressions = compare_to_baseline(args.baseline, results, args.fail_threshold)
+    if args.save_baseline:
+        save_results(args.baseline, results)
+
+    if regressions:
+        print(f"\n❌ Startup regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
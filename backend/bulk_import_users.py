@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Bulk import users from a CSV or NDJSON file
+
+Usage:
+    python bulk_import_users.py students.csv
+    python bulk_import_users.py students.ndjson --workers 8 --dry-run
+"""
+
+import argparse
+import json
+import time
+from database import SessionLocal, create_tables
+from utils.user_import import parse_users, import_users, DEFAULT_BATCH_SIZE
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import users from CSV or NDJSON")
+    parser.add_argument("file", help="CSV file with a username,email,password header, or NDJSON file")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Input format (detected if omitted)")
+    parser.add_argument("--workers", type=int, default=None, help="Password hashing processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per INSERT batch")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and report conflicts without inserting")
+    parser.add_argument("--report", help="Write per-row results to this NDJSON file")
+    args = parser.parse_args()
+
+    with open(args.file, encoding="utf-8-sig") as f:
+        rows = parse_users(f.read(), args.format)
+
+    print(f"📥 Importing {len(rows)} users from {args.file}...")
+    create_tables()
+    db = SessionLocal()
+    try:
+        start_time = time.time()
+        result = import_users(db, rows, workers=args.workers, batch_size=args.batch_size, dry_run=args.dry_run)
+        elapsed = round(time.time() - start_time, 2)
+    finally:
+        db.close()
+
+    for row in result["results"]:
+        if row["status"] not in ("created", "valid"):
+            print(f"⚠️  Row {row['row']} ({row['username']}): {row['status']} - {row['detail']}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            for row in result["results"]:
+                f.write(json.dumps(row) + "\n")
+
+    label = "Valid" if args.dry_run else "Created"
+    print(f"\n✅ Import finished in {elapsed} seconds")
+    print(f"   {label}: {result['created']}")
+    print(f"   Failed: {result['failed']}")
+
+if __name__ == "__main__":
+    main()
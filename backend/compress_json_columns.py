@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Compress legacy plain-JSON values in the quiz tables
+
+Rows written before compressed JSON columns still read fine, but keep their
+full size until rewritten. This walks quiz_attempts and question_sets in
+small committed batches and rewrites those values in the compressed format.
+It is safe to run while the app is serving traffic; use --pause to throttle.
+
+Usage:
+    python compress_json_columns.py
+    python compress_json_columns.py --batch-size 200 --pause 0.5
+    python compress_json_columns.py --dry-run   # report the savings only
+"""
+
+import argparse
+from database import engine
+from utils.json_compression import COMPRESSED_COLUMNS, convert_table
+
+def compress_all(batch_size=500, pause=0.0, dry_run=False):
+    print("🗜️  Compressing JSON columns..." + (" (dry run)" if dry_run else ""))
+    total_before = total_after = 0
+    for table_name, columns in COMPRESSED_COLUMNS.items():
+        stats = convert_table(engine, table_name, columns, batch_size, pause, dry_run)
+        total_before += stats["bytes_before"]
+        total_after += stats["bytes_after"]
+        print(f"✅ {table_name}: {stats['converted']} values in {stats['rows']} rows "
+              f"({stats['bytes_before']:,} → {stats['bytes_after']:,} bytes)")
+
+    if total_before:
+        print(f"📊 Total: {total_before:,} → {total_after:,} bytes ({total_after / total_before:.0%} of original)")
+    else:
+        print("📊 Nothing left to compress")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compress legacy JSON values in the quiz tables")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per committed batch")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    parser.add_argument("--dry-run", action="store_true", help="Report sizes without writing")
+    args = parser.parse_args()
+    compress_all(args.batch_size, args.pause, args.dry_run)
@@ -0,0 +1,56 @@
+from typing import Optional
+from fastapi import HTTPException, status, UploadFile
+from sqlalchemy.orm import Session
+from database import run_in_db_thread
+from auth_models import BulkImportResponse
+from utils.user_import import IMPORT_MAX_BYTES, IMPORT_MAX_ROWS, parse_users, import_users
+
+class AdminController:
+    
+    async def import_users(
+        self,
+        file: UploadFile,
+        db: Session,
+        fmt: Optional[str] = None,
+        dry_run: bool = False
+    ) -> BulkImportResponse:
+        """Bulk register users from an uploaded CSV or NDJSON file"""
+        if fmt is None and file.filename:
+            if file.filename.endswith(".csv"):
+                fmt = "csv"
+            elif file.filename.endswith((".ndjson", ".jsonl")):
+                fmt = "ndjson"
+        
+        # Read one byte past the limit to tell "at the limit" from "over it"
+        data = await file.read(IMPORT_MAX_BYTES + 1)
+        if len(data) > IMPORT_MAX_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Upload is larger than {IMPORT_MAX_BYTES} bytes"
+            )
+        
+        try:
+            rows = parse_users(data.decode("utf-8-sig"), fmt)
+        except (UnicodeDecodeError, ValueError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Could not parse upload: {str(e)}"
+            )
+        
+        if len(rows) > IMPORT_MAX_ROWS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Upload has more than {IMPORT_MAX_ROWS} rows; use bulk_import_users.py for larger files"
+            )
+        
+        try:
+            # Hashing uses the shared thread pool and the sync session blocks;
+            # keep both off the event loop
+            result = await run_in_db_thread(import_users, db, rows, dry_run=dry_run, use_threads=True)
+            return BulkImportResponse(**result)
+        except Exception as e:
+            await run_in_db_thread(db.rollback)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Bulk import failed: {str(e)}"
+            )
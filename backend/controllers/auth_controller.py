@@ -1,8 +1,10 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, status, Depends
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from database import get_db, User
+from database import get_async_db, User
 from auth_models import UserRegister, UserLogin, LoginResponse, UserResponse, MessageResponse
 from utils.auth_utils import (
     get_password_hash, 
@@ -10,14 +12,15 @@ from utils.auth_utils import (
     create_access_token, 
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from utils.login_guard import login_admission
 
 class AuthController:
     
-    async def register_user(self, user_data: UserRegister, db: Session = Depends(get_db)) -> UserResponse:
+    async def register_user(self, user_data: UserRegister, db: AsyncSession = Depends(get_async_db)) -> UserResponse:
         """Register a new user"""
         try:
-            # Validate email format
-            if not user_data.validate_email_format():
+            # Validate email format (off the event loop: deliverability mode resolves DNS)
+            if not await run_in_threadpool(user_data.validate_email_format):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Invalid email format"
@@ -31,51 +34,44 @@ class AuthController:
                     detail=password_message
                 )
             
-            # Check if user already exists
-            existing_user = db.query(User).filter(
-                (User.username == user_data.username) | (User.email == user_data.email)
-            ).first()
+            # Hash password (bcrypt is deliberately slow; keep it off the event loop)
+            hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
             
-            if existing_user:
-                if existing_user.username == user_data.username:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Username already registered"
-                    )
-                else:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Email already registered"
-                    )
+            # Insert first and let the unique indexes reject duplicates; this
+            # avoids a racy pre-check SELECT and the refresh after commit
+            values = {
+                "username": user_data.username,
+                "email": user_data.email,
+                "hashed_password": hashed_password,
+                "is_active": True,
+                # Naive UTC, as the DateTime column stores it and every later read returns it
+                "created_at": datetime.now(timezone.utc).replace(tzinfo=None),
+            }
+            values["updated_at"] = values["created_at"]
             
-            # Hash password
-            hashed_password = get_password_hash(user_data.password)
+            stmt = insert(User).values(**values)
+            if db.get_bind().dialect.insert_returning:
+                user_id = (await db.execute(stmt.returning(User.id))).scalar_one()
+            else:
+                user_id = (await db.execute(stmt)).inserted_primary_key[0]
+            await db.commit()
             
-            # Create new user
-            db_user = User(
-                username=user_data.username,
-                email=user_data.email,
-                hashed_password=hashed_password
-            )
-            
-            db.add(db_user)
-            db.commit()
-            db.refresh(db_user)
-            
-            return UserResponse.model_validate(db_user)
+            return UserResponse(id=user_id, **values)
             
         except HTTPException:
             # Re-raise HTTPExceptions as they are (don't wrap them)
-            db.rollback()
+            await db.rollback()
             raise
-        except IntegrityError:
-            db.rollback()
+        except IntegrityError as e:
+            await db.rollback()
+            field = self._duplicate_field(e)
+            detail = f"{field.capitalize()} already registered" if field else "User with this username or email already exists"
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User with this username or email already exists"
+                detail=detail
             )
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"Registration error type: {type(e)}")
             print(f"Registration error message: {str(e)}")
             print(f"Registration error repr: {repr(e)}")
@@ -88,12 +84,34 @@ class AuthController:
                 detail=f"Registration failed: {error_msg}"
             )
     
-    async def login_user(self, user_data: UserLogin, db: Session = Depends(get_db)) -> LoginResponse:
+    def _duplicate_field(self, error: IntegrityError):
+        """Work out which unique column a duplicate-key error came from"""
+        # SQLite: "UNIQUE constraint failed: users.username"
+        # MySQL:  "Duplicate entry 'x' for key 'users.ix_users_username'"
+        message = str(error.orig).lower()
+        for field in ("username", "email"):
+            if f"users.{field}" in message or f"ix_users_{field}" in message:
+                return field
+        return None
+    
+    async def login_user(
+        self,
+        user_data: UserLogin,
+        db: AsyncSession = Depends(get_async_db),
+        client_ip: str = "unknown"
+    ) -> LoginResponse:
         """Authenticate user and return token"""
+        # Reject floods before spending any CPU on bcrypt
+        login_admission.admit(user_data.username, client_ip)
+        
         # Find user by username
-        user = db.query(User).filter(User.username == user_data.username).first()
+        user = await db.scalar(select(User).where(User.username == user_data.username))
+        
+        # Hand the connection back to the pool before the slow hash; otherwise a
+        # login flood pins every pooled connection while waiting on bcrypt
+        await db.close()
         
-        if not user or not verify_password(user_data.password, user.hashed_password):
+        if not user or not await login_admission.verify(verify_password, user_data.password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
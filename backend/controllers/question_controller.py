@@ -5,7 +5,14 @@ from utils.llm_client import GeminiClient
 
 class QuestionController:
     def __init__(self):
-        self.llm_client = GeminiClient()
+        self._llm_client = None
+
+    @property
+    def llm_client(self) -> GeminiClient:
+        """Created on first use, so a missing GOOGLE_API_KEY fails question generation rather than startup"""
+        if self._llm_client is None:
+            self._llm_client = GeminiClient()
+        return self._llm_client
     
     async def generate_questions(self, request: GenerateQuestionsRequest) -> GenerateQuestionsResponse:
         """Generate questions based on topic and number requested"""
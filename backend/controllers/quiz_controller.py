@@ -1,29 +1,128 @@
-import json
 from datetime import datetime, timezone
-from typing import List
-from fastapi import HTTPException, status, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
-from database import get_db, QuizAttempt, User
+from typing import List, Optional
+from fastapi import HTTPException, Response, status, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import desc, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from database import (
+    get_async_db,
+    mark_user_write,
+    should_read_primary,
+    AsyncSessionLocal,
+    AsyncReadSessionLocal,
+    QuizAttempt,
+    QuestionSet,
+    User
+)
 from quiz_models import (
     QuizAttemptCreate, 
     QuizAttemptUpdate, 
     QuizAttemptResponse, 
     QuizStatsResponse,
-    RecentQuizResponse,
     QuizStatus
 )
+from utils.pagination import encode_cursor, decode_cursor, MAX_PAGE_SIZE
+from utils.data_version import data_versions, make_etag, etag_matches, cache_headers, not_modified
+from utils.response_cache import quiz_response_cache
+from utils.fast_json import dumps
+from utils.negotiation import (
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    NegotiatedResponse,
+    encode_body,
+    wants_msgpack
+)
+from utils.export import EXPORT_BATCH_SIZE, EXPORT_FORMATS, accepts_gzip, encode_batches, gzip_stream
+from utils.question_sets import get_or_create_question_set_id
+from utils.idempotency import find_replay, record_key, request_fingerprint, validate_key
+from utils.quiz_stats import (
+    get_user_stats,
+    to_stats_response,
+    record_attempt_created,
+    record_attempt_completed,
+    rebuild_user_stats
+)
+
+# Columns the dashboard list needs; questions_data and answers can be
+# several KB per row and are only loaded when a client asks for them
+SUMMARY_COLUMNS = (
+    QuizAttempt.id,
+    QuizAttempt.user_id,
+    QuizAttempt.topic,
+    QuizAttempt.total_questions,
+    QuizAttempt.score,
+    QuizAttempt.percentage,
+    QuizAttempt.status,
+    QuizAttempt.created_at,
+    QuizAttempt.completed_at,
+)
+HEAVY_FIELDS = {
+    # Shared question set, falling back to rows not yet migrated off the inline column
+    "questions_data": func.coalesce(QuestionSet.questions_data, QuizAttempt.questions_json).label("questions_data"),
+    "answers": QuizAttempt.answers,
+}
+
+# Encodings of cached completed-attempt responses, by negotiated format
+RESPONSE_FORMATS = {"json": JSON_MEDIA_TYPE, "msgpack": MSGPACK_MEDIA_TYPE}
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Parse a comma-separated ?fields= value into the heavy columns to include"""
+    if not fields:
+        return []
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in HEAVY_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(HEAVY_FIELDS)}"
+        )
+    return requested
 
 class QuizController:
     
+    async def _load_attempt(self, db: AsyncSession, quiz_id: int, user_id: int) -> Optional[QuizAttempt]:
+        """Load one of the user's attempts with its question set, refreshing any copy already in the session"""
+        result = await db.execute(
+            select(QuizAttempt)
+            .options(joinedload(QuizAttempt.question_set))
+            .where(QuizAttempt.id == quiz_id, QuizAttempt.user_id == user_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
+    
+    async def _replay(
+        self, db: AsyncSession, user_id: int, endpoint: str, key: Optional[str], fingerprint: Optional[str]
+    ) -> Optional[QuizAttemptResponse]:
+        """The response for a request already made with this Idempotency-Key, if any"""
+        if key is None:
+            return None
+        quiz_id = await db.run_sync(find_replay, user_id, endpoint, key, fingerprint)
+        if quiz_id is None:
+            return None
+        quiz_attempt = await self._load_attempt(db, quiz_id, user_id)
+        return QuizAttemptResponse.model_validate(quiz_attempt) if quiz_attempt else None
+    
     async def create_quiz_attempt(
         self, 
         quiz_data: QuizAttemptCreate, 
         current_user: User,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db),
+        idempotency_key: Optional[str] = None
     ) -> QuizAttemptResponse:
         """Create a new quiz attempt"""
+        endpoint = "POST /api/quiz/start"
+        # Read up front: a rollback expires current_user along with the rest of the session
+        user_id = current_user.id
+        key = validate_key(idempotency_key)
+        fingerprint = request_fingerprint(quiz_data.model_dump(mode="json")) if key else None
         try:
+            # A retried or double-submitted start returns the original attempt
+            replay = await self._replay(db, user_id, endpoint, key, fingerprint)
+            if replay:
+                return replay
+            
             # Calculate percentage if score is provided
             percentage = None
             completed_at = None
@@ -33,11 +132,11 @@ class QuizController:
                 completed_at = datetime.now(timezone.utc)
             
             quiz_attempt = QuizAttempt(
-                user_id=current_user.id,
+                user_id=user_id,
                 topic=quiz_data.topic,
                 total_questions=quiz_data.total_questions,
-                questions_data=json.dumps(quiz_data.questions_data),
-                answers=json.dumps(quiz_data.answers) if quiz_data.answers else None,
+                question_set_id=await db.run_sync(get_or_create_question_set_id, quiz_data.questions_data),
+                answers=dumps(quiz_data.answers) if quiz_data.answers else None,
                 score=quiz_data.score,
                 percentage=percentage,
                 status=quiz_data.status.value,
@@ -45,13 +144,36 @@ class QuizController:
             )
             
             db.add(quiz_attempt)
-            db.commit()
-            db.refresh(quiz_attempt)
+            # The stats helpers are plain Session code; run_sync drives them
+            # over the async connection without blocking the event loop
+            await db.run_sync(
+                record_attempt_created,
+                user_id, quiz_attempt.status, quiz_attempt.score, quiz_attempt.percentage
+            )
+            if key:
+                await db.run_sync(record_key, user_id, endpoint, key, fingerprint, quiz_attempt.id)
+            await db.commit()
+            mark_user_write(user_id)
+            data_versions.invalidate(user_id)
+            quiz_attempt = await self._load_attempt(db, quiz_attempt.id, user_id)
             
             return QuizAttemptResponse.model_validate(quiz_attempt)
             
+        except HTTPException:
+            await db.rollback()
+            raise
+        except IntegrityError as e:
+            await db.rollback()
+            # A concurrent request with the same Idempotency-Key committed first
+            replay = await self._replay(db, user_id, endpoint, key, fingerprint)
+            if replay:
+                return replay
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to create quiz attempt: {str(e)}"
+            )
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to create quiz attempt: {str(e)}"
@@ -62,14 +184,22 @@ class QuizController:
         quiz_id: int,
         quiz_update: QuizAttemptUpdate,
         current_user: User,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db),
+        idempotency_key: Optional[str] = None
     ) -> QuizAttemptResponse:
         """Complete a quiz attempt with answers and score"""
+        endpoint = f"PUT /api/quiz/{quiz_id}/complete"
+        # Read up front: a rollback expires current_user along with the rest of the session
+        user_id = current_user.id
+        key = validate_key(idempotency_key)
+        fingerprint = request_fingerprint(quiz_update.model_dump(mode="json")) if key else None
         try:
-            quiz_attempt = db.query(QuizAttempt).filter(
-                QuizAttempt.id == quiz_id,
-                QuizAttempt.user_id == current_user.id
-            ).first()
+            # A resubmitted completion must not count the score twice
+            replay = await self._replay(db, user_id, endpoint, key, fingerprint)
+            if replay:
+                return replay
+            
+            quiz_attempt = await self._load_attempt(db, quiz_id, user_id)
             
             if not quiz_attempt:
                 raise HTTPException(
@@ -80,75 +210,96 @@ class QuizController:
             # Calculate percentage
             percentage = (quiz_update.score / quiz_update.total_questions) * 100
             
+            previous_status = quiz_attempt.status
+            previous_score = quiz_attempt.score
+            previous_percentage = quiz_attempt.percentage
+            
             # Update quiz attempt
-            quiz_attempt.answers = json.dumps(quiz_update.answers)
+            quiz_attempt.answers = dumps(quiz_update.answers)
             quiz_attempt.score = quiz_update.score
             quiz_attempt.percentage = percentage
             quiz_attempt.status = quiz_update.status.value
             quiz_attempt.completed_at = datetime.now(timezone.utc)
             
-            db.commit()
-            db.refresh(quiz_attempt)
+            if quiz_attempt.status == QuizStatus.COMPLETED.value:
+                await db.run_sync(
+                    record_attempt_completed,
+                    user_id, previous_status, previous_score, previous_percentage,
+                    quiz_attempt.score, quiz_attempt.percentage
+                )
+            else:
+                # Unusual transition away from completed; recount from scratch
+                await db.run_sync(rebuild_user_stats, user_id)
+            
+            if key:
+                await db.run_sync(record_key, user_id, endpoint, key, fingerprint, quiz_id)
+            await db.commit()
+            mark_user_write(user_id)
+            data_versions.invalidate(user_id)
+            # Retakes re-complete an attempt, so its cached responses are stale
+            for fmt in RESPONSE_FORMATS:
+                quiz_response_cache.invalidate((user_id, quiz_id, fmt))
+            quiz_attempt = await self._load_attempt(db, quiz_id, user_id)
             
             return QuizAttemptResponse.model_validate(quiz_attempt)
             
         except HTTPException:
+            await db.rollback()
             raise
+        except IntegrityError as e:
+            await db.rollback()
+            replay = await self._replay(db, user_id, endpoint, key, fingerprint)
+            if replay:
+                return replay
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to complete quiz: {str(e)}"
+            )
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to complete quiz: {str(e)}"
             )
     
+    def _not_modified(self, kind: str, user_id: int, if_none_match: Optional[str]) -> Optional[Response]:
+        """304 if the client already has the user's current data version; runs no queries"""
+        if not if_none_match:
+            return None
+        version = data_versions.get(user_id)
+        if version is None:
+            return None
+        etag = make_etag(kind, user_id, version)
+        return not_modified(etag) if etag_matches(if_none_match, etag) else None
+    
+    def _served_version(self, kind: str, user_id: int, stats) -> str:
+        """Cache the version of the data being served and return its ETag"""
+        version = stats.data_version or 0
+        data_versions.set(user_id, version)
+        return make_etag(kind, user_id, version)
+    
     async def get_user_quiz_stats(
         self,
         current_user: User,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db),
+        if_none_match: Optional[str] = None,
+        response: Optional[Response] = None
     ) -> QuizStatsResponse:
         """Get quiz statistics for the current user"""
+        user_id = current_user.id
+        cached = self._not_modified("stats", user_id, if_none_match)
+        if cached:
+            return cached
         try:
-            # Get all quiz attempts for user
-            total_quizzes = db.query(QuizAttempt).filter(
-                QuizAttempt.user_id == current_user.id
-            ).count()
-            
-            completed_quizzes = db.query(QuizAttempt).filter(
-                QuizAttempt.user_id == current_user.id,
-                QuizAttempt.status == "completed"
-            ).count()
-            
-            incomplete_quizzes = total_quizzes - completed_quizzes
-            
-            # Get score statistics for completed quizzes
-            completed_attempts = db.query(QuizAttempt).filter(
-                QuizAttempt.user_id == current_user.id,
-                QuizAttempt.status == "completed"
-            ).all()
-            
-            if completed_attempts:
-                scores = [attempt.score for attempt in completed_attempts]
-                percentages = [attempt.percentage for attempt in completed_attempts]
-                
-                average_score = sum(scores) / len(scores)
-                highest_score = max(scores)
-                lowest_score = min(scores)
-                average_percentage = sum(percentages) / len(percentages)
-            else:
-                average_score = 0
-                highest_score = 0
-                lowest_score = 0
-                average_percentage = 0
-            
-            return QuizStatsResponse(
-                total_quizzes=total_quizzes,
-                completed_quizzes=completed_quizzes,
-                incomplete_quizzes=incomplete_quizzes,
-                average_score=round(average_score, 2),
-                highest_score=highest_score,
-                lowest_score=lowest_score,
-                average_percentage=round(average_percentage, 2)
-            )
+            # Maintained incrementally on every quiz write, so this is a
+            # primary-key lookup rather than a scan of the user's attempts
+            stats = await db.run_sync(get_user_stats, user_id)
+            etag = self._served_version("stats", user_id, stats)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            if response is not None:
+                response.headers.update(cache_headers(etag))
+            return to_stats_response(stats)
             
         except Exception as e:
             raise HTTPException(
@@ -160,28 +311,74 @@ class QuizController:
         self,
         current_user: User,
         limit: int = 10,
-        db: Session = Depends(get_db)
-    ) -> RecentQuizResponse:
-        """Get recent quiz attempts for the current user"""
+        db: AsyncSession = Depends(get_async_db),
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+        if_none_match: Optional[str] = None
+    ) -> Response:
+        """
+        Get a page of quiz attempts for the current user, newest first.
+        
+        Rows are serialized straight from the query result, in the shape of
+        RecentQuizResponse, without building a model per row.
+        """
+        user_id = current_user.id
+        cached = self._not_modified("recent", user_id, if_none_match)
+        if cached:
+            return cached
         try:
-            # Get recent quiz attempts
-            recent_quizzes = db.query(QuizAttempt).filter(
-                QuizAttempt.user_id == current_user.id
-            ).order_by(desc(QuizAttempt.created_at)).limit(limit).all()
-            
-            quiz_responses = [
-                QuizAttemptResponse.model_validate(quiz) 
-                for quiz in recent_quizzes
-            ]
-            
-            # Get stats
-            stats = await self.get_user_quiz_stats(current_user, db)
-            
-            return RecentQuizResponse(
-                quizzes=quiz_responses,
-                stats=stats
+            limit = max(1, min(limit, MAX_PAGE_SIZE))
+            position = decode_cursor(cursor)
+            extra_fields = parse_fields(fields)
+            
+            # Read the stats row (and its version) before the list, so the
+            # ETag can only be older than the data it's sent with, never newer
+            stats = await db.run_sync(get_user_stats, user_id)
+            etag = self._served_version("recent", user_id, stats)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            columns = SUMMARY_COLUMNS + tuple(HEAVY_FIELDS[f] for f in extra_fields)
+            
+            # Keyset pagination over (created_at, id): each page is a range
+            # scan of ix_quiz_attempts_user_created, however deep it is
+            query = select(*columns).select_from(QuizAttempt)
+            if "questions_data" in extra_fields:
+                query = query.outerjoin(QuestionSet, QuizAttempt.question_set_id == QuestionSet.id)
+            query = query.where(QuizAttempt.user_id == user_id)
+            if position:
+                created_at, last_id = position
+                query = query.where(
+                    QuizAttempt.created_at <= created_at,
+                    or_(
+                        QuizAttempt.created_at < created_at,
+                        QuizAttempt.id < last_id
+                    )
+                )
+            
+            # Fetch one extra row to learn whether another page exists
+            rows = (await db.execute(
+                query.order_by(desc(QuizAttempt.created_at), desc(QuizAttempt.id)).limit(limit + 1)
+            )).all()
+            
+            recent_quizzes = rows[:limit]
+            next_cursor = None
+            if len(rows) > limit:
+                last = recent_quizzes[-1]
+                next_cursor = encode_cursor(last.created_at, last.id)
+            
+            # Only the selected columns are present, so unrequested heavy
+            # fields are left out of the response
+            return NegotiatedResponse(
+                {
+                    "quizzes": [dict(row._mapping) for row in recent_quizzes],
+                    "stats": to_stats_response(stats).model_dump(),
+                    "next_cursor": next_cursor,
+                },
+                headers=cache_headers(etag)
             )
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -192,14 +389,21 @@ class QuizController:
         self,
         quiz_id: int,
         current_user: User,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db),
+        if_none_match: Optional[str] = None
     ) -> QuizAttemptResponse:
         """Get a specific quiz attempt"""
+        user_id = current_user.id
+        fmt = "msgpack" if wants_msgpack() else "json"
+        cache_key = (user_id, quiz_id, fmt)
+        cached = quiz_response_cache.get(cache_key)
+        if cached:
+            etag, body = cached
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            return Response(body, media_type=RESPONSE_FORMATS[fmt], headers=cache_headers(etag))
         try:
-            quiz_attempt = db.query(QuizAttempt).filter(
-                QuizAttempt.id == quiz_id,
-                QuizAttempt.user_id == current_user.id
-            ).first()
+            quiz_attempt = await self._load_attempt(db, quiz_id, user_id)
             
             if not quiz_attempt:
                 raise HTTPException(
@@ -207,7 +411,18 @@ class QuizController:
                     detail="Quiz attempt not found"
                 )
             
-            return QuizAttemptResponse.model_validate(quiz_attempt)
+            response = QuizAttemptResponse.model_validate(quiz_attempt)
+            if quiz_attempt.status != QuizStatus.COMPLETED.value:
+                # Still being played; don't cache
+                return response
+            
+            # Completed attempts only change on a retake, which invalidates
+            # the entry, so keep the encoded bytes for the next read
+            body, media_type = encode_body(response.model_dump(mode="json"))
+            etag = quiz_response_cache.set(cache_key, body)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            return Response(body, media_type=media_type, headers=cache_headers(etag))
             
         except HTTPException:
             raise
@@ -215,4 +430,47 @@ class QuizController:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to get quiz attempt: {str(e)}"
-            )
\ No newline at end of file
+            )
+    
+    def export_quizzes(
+        self,
+        current_user: User,
+        fmt: str = "ndjson",
+        accept_encoding: Optional[str] = None
+    ) -> StreamingResponse:
+        """Stream the user's full quiz history, oldest first, as NDJSON or CSV"""
+        if fmt not in EXPORT_FORMATS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown format: {fmt}. Allowed: {', '.join(EXPORT_FORMATS)}"
+            )
+        user_id = current_user.id
+        query = (
+            select(*SUMMARY_COLUMNS, *HEAVY_FIELDS.values())
+            .select_from(QuizAttempt)
+            .outerjoin(QuestionSet, QuizAttempt.question_set_id == QuestionSet.id)
+            .where(QuizAttempt.user_id == user_id)
+            .order_by(QuizAttempt.created_at, QuizAttempt.id)
+            # Server-side cursor: rows arrive EXPORT_BATCH_SIZE at a time
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        columns = list(query.selected_columns.keys())
+        
+        async def batches():
+            # The body is sent after the request's dependencies have been
+            # torn down, so the stream opens and closes its own session
+            session = AsyncSessionLocal() if should_read_primary(user_id) else AsyncReadSessionLocal()
+            async with session as db:
+                result = await db.stream(query)
+                async for rows in result.partitions():
+                    yield rows
+        
+        body = encode_batches(fmt, columns, batches())
+        headers = {
+            "Content-Disposition": f'attachment; filename="quiz_history.{fmt}"',
+            "Vary": "Accept-Encoding",
+        }
+        if accepts_gzip(accept_encoding):
+            body = gzip_stream(body)
+            headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(body, media_type=EXPORT_FORMATS[fmt], headers=headers)
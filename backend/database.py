@@ -1,9 +1,16 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey
+from sqlalchemy import create_engine, event, Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.engine import make_url
 from datetime import datetime, timezone
+from functools import partial
 import os
+import time
+import anyio
 from dotenv import load_dotenv
+from utils.json_compression import CompressedJSONText
+from utils.metrics import instrument_engine
+from utils import profiling
 
 load_dotenv()
 
@@ -13,12 +20,215 @@ DATABASE_URL = os.getenv(
     "sqlite:///./question_generator.db"
 )
 
-# For SQLite, we need to enable foreign keys and use check_same_thread=False
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(DATABASE_URL)
+# Named engine profiles. DB_PROFILE picks one (default: by DATABASE_URL
+# dialect); the DB_POOL_* / SQLITE_* variables override individual settings.
+ENGINE_PROFILES = {
+    # Local development on SQLite: WAL lets readers run alongside a writer,
+    # and busy_timeout makes concurrent writers wait instead of failing
+    # with "database is locked"
+    "sqlite-dev": {
+        "engine": {},
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,
+        },
+    },
+    # Production MySQL: a larger pool, dead connections detected before use,
+    # and connections recycled before the server's wait_timeout drops them
+    "mysql-prod": {
+        "engine": {
+            "pool_size": 10,
+            "max_overflow": 20,
+            "pool_timeout": 30,
+            "pool_recycle": 1800,
+            "pool_pre_ping": True,
+        },
+        "pragmas": {},
+    },
+    # Plain SQLAlchemy defaults
+    "default": {"engine": {}, "pragmas": {}},
+}
+
+ENV_OVERRIDES = {
+    "engine": {
+        "DB_POOL_SIZE": ("pool_size", int),
+        "DB_MAX_OVERFLOW": ("max_overflow", int),
+        "DB_POOL_TIMEOUT": ("pool_timeout", int),
+        "DB_POOL_RECYCLE": ("pool_recycle", int),
+        "DB_POOL_PRE_PING": ("pool_pre_ping", lambda v: v.lower() in ("1", "true", "yes")),
+    },
+    "pragmas": {
+        "SQLITE_JOURNAL_MODE": ("journal_mode", str),
+        "SQLITE_SYNCHRONOUS": ("synchronous", str),
+        "SQLITE_BUSY_TIMEOUT_MS": ("busy_timeout", int),
+    },
+}
+
+def get_engine_profile(url: str) -> dict:
+    """Resolve DB_PROFILE plus env overrides into engine kwargs and SQLite pragmas"""
+    is_sqlite = make_url(url).get_backend_name() == "sqlite"
+    name = os.getenv("DB_PROFILE") or ("sqlite-dev" if is_sqlite else "mysql-prod")
+    if name not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE {name!r}; expected one of {', '.join(ENGINE_PROFILES)}")
+
+    profile = {key: dict(value) for key, value in ENGINE_PROFILES[name].items()}
+    for section, variables in ENV_OVERRIDES.items():
+        for variable, (key, convert) in variables.items():
+            if os.getenv(variable):
+                profile[section][key] = convert(os.getenv(variable))
+    if is_sqlite:
+        # Pool sizing doesn't apply to SQLite's file connections
+        for key in ("pool_size", "max_overflow", "pool_timeout"):
+            profile["engine"].pop(key, None)
+    else:
+        profile["pragmas"] = {}
+    profile["name"] = name
+    return profile
+
+def _apply_pragmas(engine, pragmas: dict):
+    """Set SQLite pragmas on every new connection of a (sync or async) engine"""
+    if not pragmas:
+        return
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for key, value in pragmas.items():
+            cursor.execute(f"PRAGMA {key}={value}")
+        cursor.close()
+
+    event.listen(engine.sync_engine if hasattr(engine, "sync_engine") else engine, "connect", on_connect)
+
+def build_engine(url: str, name: str = "primary"):
+    """Create a sync engine for `url` using the active profile; `name` labels its metrics"""
+    profile = get_engine_profile(url)
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    new_engine = create_engine(url, connect_args=connect_args, **profile["engine"])
+    _apply_pragmas(new_engine, profile["pragmas"])
+    instrument_engine(new_engine, name)
+    profiling.instrument_engine(new_engine)
+    return new_engine
+
+def build_async_engine(url: str, name: str = "primary-async"):
+    """Create an async engine for `url` using the active profile; `name` labels its metrics"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    profile = get_engine_profile(url)
+    new_engine = create_async_engine(url, **profile["engine"])
+    _apply_pragmas(new_engine, profile["pragmas"])
+    instrument_engine(new_engine, name)
+    profiling.instrument_engine(new_engine)
+    return new_engine
+
+engine = build_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Optional read replica. Read-only quiz endpoints (stats, recent quizzes) are
+# routed here; everything else, and a user's reads right after they write,
+# goes to the primary. Without a replica all reads use the primary.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+READ_AFTER_WRITE_SECONDS = float(os.getenv("READ_AFTER_WRITE_SECONDS", "5"))
+
+read_engine = build_engine(DATABASE_READ_URL, "replica") if DATABASE_READ_URL else engine
+ReadSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=read_engine, info={"read_only": bool(DATABASE_READ_URL)}
+)
+
+# Async drivers used by the async engine for each sync dialect
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "mysql": "aiomysql",
+}
+
+def make_async_url(url: str) -> str:
+    """Swap the sync DBAPI driver in a database URL for its async counterpart"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(
+            f"No async driver configured for {parsed.get_backend_name()}; "
+            "set ASYNC_DATABASE_URL (and ASYNC_DATABASE_READ_URL for a replica)"
+        )
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+# Explicit async URLs; when unset they are derived from the sync URLs on first
+# use, so a dialect without an entry above only fails if the async engine is needed
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+ASYNC_DATABASE_READ_URL = os.getenv("ASYNC_DATABASE_READ_URL")
+
+_async_engine = None
+_async_read_engine = None
+_async_sessionmaker = None
+_async_read_sessionmaker = None
+
+def get_async_engine():
+    """Create the async engines on first use, so scripts that only use the sync engine don't need the async driver"""
+    global _async_engine, _async_read_engine, _async_sessionmaker, _async_read_sessionmaker
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        _async_engine = build_async_engine(ASYNC_DATABASE_URL or make_async_url(DATABASE_URL))
+        # Objects stay readable after commit, as response models are built from them
+        _async_sessionmaker = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+        if DATABASE_READ_URL:
+            _async_read_engine = build_async_engine(
+                ASYNC_DATABASE_READ_URL or make_async_url(DATABASE_READ_URL), "replica-async"
+            )
+        else:
+            _async_read_engine = _async_engine
+        _async_read_sessionmaker = async_sessionmaker(
+            _async_read_engine, autoflush=False, expire_on_commit=False,
+            info={"read_only": bool(DATABASE_READ_URL)}
+        )
+    return _async_engine
+
+async def dispose_engines():
+    """Close pooled connections of every engine created so far (on app shutdown)"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        if _async_read_engine is not _async_engine:
+            await _async_read_engine.dispose()
+    engine.dispose()
+    if read_engine is not engine:
+        read_engine.dispose()
+
+def AsyncSessionLocal():
+    get_async_engine()
+    return _async_sessionmaker()
+
+def AsyncReadSessionLocal():
+    get_async_engine()
+    return _async_read_sessionmaker()
+
+# Read-your-writes: users who just wrote read from the primary until the
+# replica has had time to catch up
+_recent_writes = {}
+
+def mark_user_write(user_id: int):
+    """Record that a user just wrote, so their next reads skip the replica"""
+    if not DATABASE_READ_URL:
+        return
+    now = time.monotonic()
+    _recent_writes[user_id] = now
+    if len(_recent_writes) > 10000:
+        cutoff = now - READ_AFTER_WRITE_SECONDS
+        for key in [k for k, t in _recent_writes.items() if t < cutoff]:
+            del _recent_writes[key]
+
+def should_read_primary(user_id: int) -> bool:
+    written_at = _recent_writes.get(user_id)
+    return written_at is not None and time.monotonic() - written_at < READ_AFTER_WRITE_SECONDS
+
+# Bounded threadpool for code that still needs the sync session, so it never
+# runs on the event loop and can't exhaust the shared worker threads
+DB_THREADPOOL_SIZE = int(os.getenv("DB_THREADPOOL_SIZE", "8"))
+_db_thread_limiter = None
+
+async def run_in_db_thread(func, *args, **kwargs):
+    """Run a blocking database function in the bounded database threadpool"""
+    global _db_thread_limiter
+    if _db_thread_limiter is None:
+        _db_thread_limiter = anyio.CapacityLimiter(DB_THREADPOOL_SIZE)
+    return await anyio.to_thread.run_sync(partial(func, *args, **kwargs), limiter=_db_thread_limiter)
+
 Base = declarative_base()
 
 # User model
@@ -35,6 +245,21 @@ class User(Base):
     
     # Relationship to quiz attempts
     quiz_attempts = relationship("QuizAttempt", back_populates="user")
+    
+    # Incremental analytics exports scan by (updated_at, id); see migrations/0004
+    __table_args__ = (
+        Index("ix_users_updated", "updated_at", "id"),
+    )
+
+# Question set model: each distinct set of questions is stored once, keyed by
+# the SHA-256 of its canonical JSON, and shared by every attempt that uses it
+class QuestionSet(Base):
+    __tablename__ = "question_sets"
+    
+    id = Column(Integer, primary_key=True)
+    content_hash = Column(String(64), unique=True, index=True, nullable=False)
+    questions_data = Column(CompressedJSONText, nullable=False)  # Canonical JSON string of questions
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
 # Quiz Attempt model
 class QuizAttempt(Base):
@@ -44,16 +269,76 @@ class QuizAttempt(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     topic = Column(String(200), nullable=False)
     total_questions = Column(Integer, nullable=False)
-    questions_data = Column(Text, nullable=False)  # JSON string of questions
-    answers = Column(Text, nullable=True)  # JSON string of user answers
+    question_set_id = Column(Integer, ForeignKey("question_sets.id"), nullable=True, index=True)
+    # Inline JSON string of questions, only for rows not (yet) moved to question_sets
+    questions_json = Column("questions_data", CompressedJSONText, nullable=True)
+    answers = Column(CompressedJSONText, nullable=True)  # JSON string of user answers
     score = Column(Integer, nullable=True)
     percentage = Column(Float, nullable=True)
     status = Column(String(20), default="incomplete")  # incomplete, completed
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     completed_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
     # Relationship to user
     user = relationship("User", back_populates="quiz_attempts")
+    question_set = relationship("QuestionSet")
+    
+    @property
+    def questions_data(self):
+        """JSON string of questions, from the shared question set or the inline column"""
+        if self.question_set is not None:
+            return self.question_set.questions_data
+        return self.questions_json
+    
+    @questions_data.setter
+    def questions_data(self, value):
+        # Writing JSON directly stores it inline, detached from any shared set
+        self.questions_json = value
+        self.question_set = None
+        self.question_set_id = None
+    
+    # Every quiz query filters on user_id; see migrations/0001 for existing databases
+    __table_args__ = (
+        Index("ix_quiz_attempts_user_created", "user_id", "created_at"),
+        Index("ix_quiz_attempts_user_status", "user_id", "status"),
+        Index("ix_quiz_attempts_updated", "updated_at", "id"),
+    )
+
+# Idempotency keys for quiz writes: a retried or double-submitted request with
+# the same Idempotency-Key returns the attempt it created the first time
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    endpoint = Column(String(100), nullable=False)  # e.g. "POST /api/quiz/start"
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # SHA-256 of the request body
+    quiz_attempt_id = Column(Integer, ForeignKey("quiz_attempts.id"), nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    expires_at = Column(DateTime, nullable=False, index=True)
+    
+    __table_args__ = (
+        Index("ux_idempotency_keys_user_endpoint_key", "user_id", "endpoint", "key", unique=True),
+    )
+
+# Per-user quiz statistics, kept in step with quiz_attempts on every write
+class UserQuizStats(Base):
+    __tablename__ = "user_quiz_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_quizzes = Column(Integer, nullable=False, default=0)
+    completed_quizzes = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Integer, nullable=False, default=0)
+    score_count = Column(Integer, nullable=False, default=0)
+    percentage_sum = Column(Float, nullable=False, default=0)
+    percentage_count = Column(Integer, nullable=False, default=0)
+    highest_score = Column(Integer, nullable=True)
+    lowest_score = Column(Integer, nullable=True)
+    # Bumped on every change; /recent and /stats build their ETags from it
+    data_version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
 # Create tables
 def create_tables():
@@ -65,4 +350,15 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dependency to get an async session for read-only endpoints, on the replica
+# when one is configured
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Export quiz_attempts and users for analytics
+
+Streams each table from a server-side cursor and writes one part file per
+chunk: gzip-compressed CSV by default, or Parquet with --format parquet
+(needs pyarrow). Each run writes a new partition directory:
+
+    <out>/quiz_attempts/full-20250101T020000/part-00000.csv.gz
+    <out>/quiz_attempts/incremental-20250102T020000/part-00000.csv.gz
+
+--incremental only exports rows whose updated_at is past the watermark
+saved by the previous run in <out>/_watermarks.json. Deleted rows are not
+tracked, so take a full export now and then.
+
+Usage:
+    python export_analytics.py --out exports                     # full export
+    python export_analytics.py --out exports --incremental       # changes since last run
+    python export_analytics.py --out exports --format parquet --table quiz_attempts
+"""
+
+import argparse
+import os
+import time
+from database import SessionLocal
+from utils.analytics_export import EXPORT_COLUMNS, FORMATS, export_table, load_watermarks, save_watermarks
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Columnar / partitioned export for analytics")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="Part file format")
+    parser.add_argument("--table", choices=tuple(EXPORT_COLUMNS), action="append",
+                        help="Table to export (repeatable; default: all)")
+    parser.add_argument("--incremental", action="store_true", help="Only rows changed since the saved watermark")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows per cursor batch and part file")
+    parser.add_argument("--settle-seconds", type=int, default=5,
+                        help="Leave rows updated this recently for the next run")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    tables = args.table or list(EXPORT_COLUMNS)
+
+    os.makedirs(args.out, exist_ok=True)
+    watermarks = load_watermarks(args.out)
+
+    db = SessionLocal()
+    try:
+        for table in tables:
+            since = watermarks.get(table) if args.incremental else None
+            if args.incremental and since is None:
+                print(f"ℹ️  No watermark for {table}; exporting everything")
+            start_time = time.time()
+            print(f"📦 Exporting {table}" + (f" since {since['updated_at']}" if since else "") + "...")
+
+            result = export_table(db, table, args.out, args.format, args.chunk_size, since, args.settle_seconds)
+            # Only move the watermark once the table's files are all written
+            if result["watermark"]:
+                watermarks[table] = result["watermark"]
+                save_watermarks(args.out, watermarks)
+            db.rollback()  # end the read transaction between tables
+
+            where = result["partition"] or "nothing new"
+            print(f"✅ {table}: {result['rows']} rows in {len(result['files'])} files ({where}) "
+                  f"in {round(time.time() - start_time, 2)} seconds")
+    except Exception as e:
+        print(f"❌ Export failed: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,67 +1,77 @@
-
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routes.question_routes import router as question_router
 from routes.auth_routes import router as auth_router
-from database import create_tables
-
-# Create database tables on startup
-create_tables()
+from routes.admin_routes import router as admin_router
+from routes.quiz_routes import router as quiz_router
+from routes.metrics_routes import router as metrics_router
+from database import create_tables, dispose_engines, engine, run_in_db_thread
+from utils.compression import CompressionMiddleware
+from utils.metrics import METRICS_ENABLED, instrument_routes
+from utils.migrations import migrate_on_startup
+from utils.profiling import PROFILING_ENABLED, ProfilingMiddleware
+from utils.negotiation import ContentNegotiationMiddleware, NegotiatedResponse
 
-# Try to import quiz routes with error handling
-try:
-    from routes.quiz_routes import router as quiz_router
-    QUIZ_ROUTES_LOADED = True
-    print("✅ Quiz routes loaded successfully")
-except Exception as e:
-    print(f"❌ Failed to load quiz routes: {e}")
-    print("🔄 Loading simple quiz routes as fallback")
-    try:
-        from simple_quiz_routes import router as quiz_router
-        QUIZ_ROUTES_LOADED = True
-        print("✅ Simple quiz routes loaded successfully")
-    except Exception as e2:
-        print(f"❌ Failed to load simple quiz routes: {e2}")
-        QUIZ_ROUTES_LOADED = False
+router = APIRouter()
 
-app = FastAPI(
-    title="Question Generator API with Authentication",
-    description="API for generating educational questions using AI with user authentication",
-    version="2.0.0"
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database tables and apply pending migrations when a worker starts
+    # serving, not when main is imported
+    await run_in_db_thread(create_tables)
+    await run_in_db_thread(migrate_on_startup, engine)
+    yield
+    await dispose_engines()
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def create_app() -> FastAPI:
+    """Build the application; importing this module has no side effects beyond building `app`"""
+    app = FastAPI(
+        title="Question Generator API with Authentication",
+        description="API for generating educational questions using AI with user authentication",
+        version="2.0.0",
+        default_response_class=NegotiatedResponse,
+        lifespan=lifespan
+    )
 
-# Include routers
-app.include_router(auth_router)
-app.include_router(question_router)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    # JSON or MessagePack per the Accept header, then gzip/brotli above a size threshold
+    app.add_middleware(ContentNegotiationMiddleware)
+    app.add_middleware(CompressionMiddleware)
+    # Opt-in: sampled and slow requests are profiled to PROFILE_DIR (outermost, so it sees everything)
+    if PROFILING_ENABLED:
+        app.add_middleware(ProfilingMiddleware)
 
-# Only include quiz router if it loaded successfully
-if QUIZ_ROUTES_LOADED:
+    # Include routers
+    app.include_router(auth_router)
+    app.include_router(question_router)
+    app.include_router(admin_router)
     app.include_router(quiz_router)
-    print("✅ Quiz routes included in app")
-else:
-    print("⚠️ Quiz routes not included due to import error")
+    app.include_router(router)
+    if METRICS_ENABLED:
+        app.include_router(metrics_router)
+    # Wrap each route for latency and in-flight metrics, once all routes are in
+    instrument_routes(app)
+    return app
 
-@app.get("/")
+@router.get("/")
 def hello():
     return {"message": "Question Generator API with Authentication is running!"}
 
-@app.get("/test")
+@router.get("/test")
 def test():
     return {
         "message": "Test endpoint working", 
-        "quiz_routes_loaded": QUIZ_ROUTES_LOADED,
-        "available_routes": ["auth", "questions", "quiz" if QUIZ_ROUTES_LOADED else "quiz_disabled"]
+        "available_routes": ["auth", "questions", "quiz"]
     }
 
-@app.get("/test-quiz")
+@router.get("/test-quiz")
 def test_quiz():
     """Test if quiz routes are accessible"""
     try:
@@ -103,5 +113,5 @@ def test_quiz():
         }
     except Exception as e:
         return {"message": "Quiz database error", "error": str(e)}
-    
 
+app = create_app()
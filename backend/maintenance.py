@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Database maintenance for quiz data
+
+Replaces the one-off cleanup scripts with batched, set-based passes that
+commit as they go, so they finish quickly on large tables without holding
+long locks.
+
+Subcommands:
+    dedupe   Delete duplicate incomplete attempts (see utils/maintenance.py)
+    repair   Fix attempts whose questions are missing or invalid JSON
+    vacuum   Purge expired idempotency keys, refresh planner statistics,
+             optionally delete unused question sets (API stopped) and
+             reclaim space
+
+Usage:
+    python maintenance.py dedupe --dry-run
+    python maintenance.py repair --batch-size 5000
+    python maintenance.py vacuum --compact
+    python maintenance.py vacuum --orphans   # stop the API first
+    python maintenance.py all
+"""
+
+import argparse
+import time
+from database import SessionLocal, create_tables
+from utils.maintenance import DEFAULT_BATCH_SIZE, dedupe, repair, table_counts, vacuum
+
+COMMANDS = ("dedupe", "repair", "vacuum")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Quiz database maintenance")
+    parser.add_argument("command", choices=COMMANDS + ("all",), help="Maintenance pass to run")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per batch and commit")
+    parser.add_argument("--compact", action="store_true", help="vacuum: also VACUUM / OPTIMIZE TABLE (locks tables)")
+    parser.add_argument(
+        "--orphans", action="store_true",
+        help="vacuum: also delete unreferenced question sets (stop the API first)"
+    )
+    parser.add_argument("--quiet", action="store_true", help="Only print the summary")
+    return parser.parse_args()
+
+def run(db, command, args):
+    options = {"batch_size": args.batch_size, "dry_run": args.dry_run, "verbose": not args.quiet}
+    if command == "dedupe":
+        return dedupe(db, **options)
+    if command == "repair":
+        return repair(db, **options)
+    return vacuum(db, compact=args.compact, orphans=args.orphans, **options)
+
+def main():
+    args = parse_args()
+    commands = COMMANDS if args.command == "all" else (args.command,)
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        before = table_counts(db)
+        print(f"📊 Quiz attempts before: {before}")
+        if args.dry_run:
+            print("🔍 Dry run: nothing will be written")
+
+        for command in commands:
+            start_time = time.time()
+            print(f"🧹 Running {command}...")
+            result = run(db, command, args)
+            print(f"✅ {command}: {result} in {round(time.time() - start_time, 2)} seconds")
+
+        if not args.dry_run:
+            print(f"📊 Quiz attempts after: {table_counts(db)}")
+    except Exception as e:
+        print(f"❌ Maintenance failed: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,39 @@
 #!/usr/bin/env python3
 """
-Database migration script to add quiz tracking tables
+Database migration script
+
+Creates any missing tables, then applies the versioned migrations in
+migrations/ that haven't been recorded in schema_migrations yet. Works on
+both SQLite and MySQL.
+
+Usage:
+    python migrate_db.py            # apply all pending migrations
+    python migrate_db.py --status   # list applied and pending migrations
+    python migrate_db.py --target 1 # apply up to and including version 1
 """
 
-from database import create_tables, engine, Base
-from sqlalchemy import text
+import argparse
+from database import create_tables, engine
+from utils.migrations import discover_migrations, applied_versions, run_migrations
+
+def show_status():
+    applied = applied_versions(engine)
+    for migration in discover_migrations():
+        marker = "✅" if migration.version in applied else "⏳"
+        print(f"{marker} {migration.version:04d}_{migration.name}: {migration.description}")
 
-def migrate_database():
-    """Add new tables for quiz tracking"""
+def migrate_database(target=None):
+    """Create new tables and apply pending migrations"""
     try:
         print("🚀 Migrating database...")
         
         # Create all tables (will only create new ones)
         create_tables()
         
-        print("✅ Database migration completed successfully!")
-        print("📊 Quiz tracking tables are now available")
+        ran = run_migrations(engine, target)
         
-        # Test database connection
-        from database import SessionLocal
-        db = SessionLocal()
-        try:
-            # Check if quiz_attempts table exists
-            result = db.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='quiz_attempts'")).fetchone()
-            if result:
-                print("✅ Quiz attempts table created successfully!")
-            else:
-                print("⚠️  Quiz attempts table not found")
-        except Exception as e:
-            print(f"⚠️  Database test failed: {e}")
-        finally:
-            db.close()
+        print("✅ Database migration completed successfully!")
+        print(f"📊 Applied {len(ran)} migration(s)")
             
     except Exception as e:
         print(f"❌ Database migration failed: {e}")
@@ -39,4 +42,12 @@ def migrate_database():
     return True
 
 if __name__ == "__main__":
-    migrate_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Apply database migrations")
+    parser.add_argument("--status", action="store_true", help="Show applied and pending migrations")
+    parser.add_argument("--target", type=int, help="Apply migrations up to this version")
+    args = parser.parse_args()
+
+    if args.status:
+        show_status()
+    else:
+        migrate_database(args.target)
@@ -0,0 +1,9 @@
+"""Add (user_id, created_at) and (user_id, status) indexes to quiz_attempts"""
+
+from utils.migrations import create_index_if_missing
+
+def upgrade(conn):
+    # Recent quizzes filter on user_id and order by created_at
+    create_index_if_missing(conn, "quiz_attempts", "ix_quiz_attempts_user_created", ["user_id", "created_at"])
+    # Stats and cleanup queries filter on user_id and status
+    create_index_if_missing(conn, "quiz_attempts", "ix_quiz_attempts_user_status", ["user_id", "status"])
@@ -0,0 +1,78 @@
+"""Move quiz questions into shared, content-addressed question_sets rows"""
+
+import json
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, MetaData, String, Table, Text, bindparam, select, update
+from utils.json_compression import decode_json
+from utils.migrations import add_column_if_missing, create_index_if_missing, make_column_nullable
+from utils.question_sets import canonical_questions_json, content_hash
+
+BATCH_SIZE = 1000
+
+_meta = MetaData()
+question_sets = Table(
+    "question_sets",
+    _meta,
+    Column("id", Integer, primary_key=True),
+    Column("content_hash", String(64), unique=True, index=True, nullable=False),
+    Column("questions_data", Text, nullable=False),
+    Column("created_at", DateTime),
+)
+
+def upgrade(conn):
+    question_sets.create(conn, checkfirst=True)
+    add_column_if_missing(conn, "quiz_attempts", Column("question_set_id", Integer, ForeignKey("question_sets.id")))
+    create_index_if_missing(conn, "quiz_attempts", "ix_quiz_attempts_question_set_id", ["question_set_id"])
+    make_column_nullable(conn, "quiz_attempts", "questions_data")
+    conn.commit()
+
+    attempts = Table("quiz_attempts", MetaData(), autoload_with=conn)
+    set_ids = {}
+    moved = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(attempts.c.id, attempts.c.questions_data)
+            .where(
+                attempts.c.id > last_id,
+                attempts.c.question_set_id.is_(None),
+                attempts.c.questions_data.isnot(None)
+            )
+            .order_by(attempts.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        links = []
+        for row in rows:
+            try:
+                canonical = canonical_questions_json(json.loads(decode_json(row.questions_data)))
+            except ValueError:
+                # Leave unparseable data inline; it is still read from there
+                continue
+            digest = content_hash(canonical)
+            if digest not in set_ids:
+                set_ids[digest] = conn.scalar(
+                    select(question_sets.c.id).where(question_sets.c.content_hash == digest)
+                )
+            if set_ids[digest] is None:
+                result = conn.execute(question_sets.insert().values(
+                    content_hash=digest,
+                    questions_data=canonical,
+                    created_at=datetime.now(timezone.utc)
+                ))
+                set_ids[digest] = result.inserted_primary_key[0]
+            links.append({"attempt_id": row.id, "set_id": set_ids[digest]})
+
+        if links:
+            conn.execute(
+                update(attempts)
+                .where(attempts.c.id == bindparam("attempt_id"))
+                .values(question_set_id=bindparam("set_id"), questions_data=None),
+                links
+            )
+        conn.commit()
+        moved += len(links)
+        print(f"   ↳ {moved} attempts linked to {len(set_ids)} question sets")
@@ -0,0 +1,22 @@
+"""Store quiz JSON columns as binary so they can hold compressed values"""
+
+from sqlalchemy import inspect, text
+
+COLUMNS = (
+    ("quiz_attempts", "questions_data"),
+    ("quiz_attempts", "answers"),
+    ("question_sets", "questions_data"),
+)
+
+def upgrade(conn):
+    # SQLite keeps blobs in TEXT columns as-is, so only MySQL needs a change.
+    # Existing values are left as plain JSON, which still reads transparently;
+    # compress_json_columns.py rewrites them in the background.
+    if conn.dialect.name != "mysql":
+        return
+    for table_name, column_name in COLUMNS:
+        column = {c["name"]: c for c in inspect(conn).get_columns(table_name)}[column_name]
+        if "BLOB" in str(column["type"]).upper():
+            continue
+        null = "NULL" if column["nullable"] else "NOT NULL"
+        conn.execute(text(f"ALTER TABLE `{table_name}` MODIFY `{column_name}` LONGBLOB {null}"))
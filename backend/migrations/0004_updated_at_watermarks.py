@@ -0,0 +1,35 @@
+"""Track quiz_attempts.updated_at and index (updated_at, id) for incremental exports"""
+
+from sqlalchemy import Column, DateTime, MetaData, Table, func, select, update
+from utils.migrations import add_column_if_missing, create_index_if_missing
+
+BATCH_SIZE = 1000
+
+def _backfill(conn, table, value):
+    """Set updated_at where it is missing, one committed batch of ids at a time"""
+    last_id = 0
+    while True:
+        ids = list(conn.scalars(
+            select(table.c.id)
+            .where(table.c.id > last_id, table.c.updated_at.is_(None))
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ))
+        if not ids:
+            break
+        last_id = ids[-1]
+        conn.execute(update(table).where(table.c.id.in_(ids)).values(updated_at=value))
+        conn.commit()
+
+def upgrade(conn):
+    add_column_if_missing(conn, "quiz_attempts", Column("updated_at", DateTime))
+    conn.commit()
+
+    attempts = Table("quiz_attempts", MetaData(), autoload_with=conn)
+    users = Table("users", MetaData(), autoload_with=conn)
+    # Best guess for existing rows: the last time we know they changed
+    _backfill(conn, attempts, func.coalesce(attempts.c.completed_at, attempts.c.created_at))
+    _backfill(conn, users, users.c.created_at)
+
+    create_index_if_missing(conn, "quiz_attempts", "ix_quiz_attempts_updated", ["updated_at", "id"])
+    create_index_if_missing(conn, "users", "ix_users_updated", ["updated_at", "id"])
@@ -0,0 +1,10 @@
+"""Add user_quiz_stats.data_version for conditional GETs on /recent and /stats"""
+
+from sqlalchemy import Column, Integer, MetaData, Table, update
+from utils.migrations import add_column_if_missing
+
+def upgrade(conn):
+    if add_column_if_missing(conn, "user_quiz_stats", Column("data_version", Integer)):
+        # One row per user, so a single statement is fine
+        stats = Table("user_quiz_stats", MetaData(), autoload_with=conn)
+        conn.execute(update(stats).values(data_version=0))
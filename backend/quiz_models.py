@@ -37,6 +37,20 @@ class QuizAttemptResponse(BaseModel):
     
     model_config = {"from_attributes": True}
 
+class QuizAttemptSummary(BaseModel):
+    """List view of an attempt; the heavy JSON columns are only set when requested"""
+    id: int
+    user_id: int
+    topic: str
+    total_questions: int
+    score: Optional[int] = None
+    percentage: Optional[float] = None
+    status: QuizStatus
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    questions_data: Optional[str] = None
+    answers: Optional[str] = None
+
 class QuizStatsResponse(BaseModel):
     total_quizzes: int
     completed_quizzes: int
@@ -47,5 +61,6 @@ class QuizStatsResponse(BaseModel):
     average_percentage: float
 
 class RecentQuizResponse(BaseModel):
-    quizzes: List[QuizAttemptResponse]
-    stats: QuizStatsResponse
\ No newline at end of file
+    quizzes: List[QuizAttemptSummary]
+    stats: QuizStatsResponse
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page
\ No newline at end of file
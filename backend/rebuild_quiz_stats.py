@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Rebuild the user_quiz_stats summary table from quiz_attempts
+
+Run this after editing quiz_attempts outside the API (cleanup scripts,
+manual fixes) or to repair drift.
+
+Usage:
+    python rebuild_quiz_stats.py              # rebuild every user
+    python rebuild_quiz_stats.py --user-id 3  # rebuild one user
+    python rebuild_quiz_stats.py --check      # report drift without writing
+"""
+
+import argparse
+import time
+from database import SessionLocal, UserQuizStats, User, create_tables
+from utils.quiz_stats import compute_user_stats, rebuild_user_stats, rebuild_all_stats
+
+def check_stats(db):
+    """Compare stored stats with a fresh aggregate for every user"""
+    drifted = 0
+    for (user_id,) in db.query(User.id).order_by(User.id).yield_per(500):
+        expected = compute_user_stats(db, user_id)
+        stored = db.get(UserQuizStats, user_id)
+        if stored is None:
+            if expected["total_quizzes"]:
+                print(f"⚠️  User {user_id}: no stats row ({expected['total_quizzes']} attempts)")
+                drifted += 1
+            continue
+        diffs = {
+            key: (getattr(stored, key), value)
+            for key, value in expected.items()
+            if abs((getattr(stored, key) or 0) - (value or 0)) > 1e-6
+        }
+        if diffs:
+            print(f"⚠️  User {user_id}: {diffs}")
+            drifted += 1
+    return drifted
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild per-user quiz stats")
+    parser.add_argument("--user-id", type=int, help="Only rebuild this user")
+    parser.add_argument("--check", action="store_true", help="Report rows that differ from quiz_attempts without writing")
+    parser.add_argument("--batch-size", type=int, default=500, help="Users per commit")
+    args = parser.parse_args()
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        start_time = time.time()
+        if args.check:
+            drifted = check_stats(db)
+            print(f"{'✅' if not drifted else '❌'} {drifted} users with drifted stats")
+        elif args.user_id:
+            rebuild_user_stats(db, args.user_id)
+            db.commit()
+            print(f"✅ Rebuilt stats for user {args.user_id}")
+        else:
+            processed = rebuild_all_stats(db, args.batch_size)
+            print(f"✅ Rebuilt stats for {processed} users")
+        print(f"⏱️  {round(time.time() - start_time, 2)} seconds")
+    except Exception as e:
+        print(f"❌ Rebuild failed: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
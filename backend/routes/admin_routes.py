@@ -0,0 +1,65 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, File, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from database import get_db, User
+from auth_models import BulkImportResponse
+from controllers.admin_controller import AdminController
+from utils.auth_utils import get_current_admin_user
+from utils.login_guard import login_admission
+from utils.response_cache import quiz_response_cache
+from utils.profiling import PROFILING_ENABLED, list_slow_requests
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+admin_controller = AdminController()
+
+@router.post("/users/import", response_model=BulkImportResponse)
+async def import_users(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    dry_run: bool = False,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk register users from a CSV or NDJSON file (Requires Admin)
+    
+    - **file**: CSV with a `username,email,password` header, or NDJSON with one user per line
+    - **format**: `csv` or `ndjson` (detected from the file name or content if omitted)
+    - **dry_run**: Validate and report conflicts without creating users
+    """
+    return await admin_controller.import_users(file, db, format, dry_run)
+
+@router.get("/login-admission")
+async def get_login_admission_stats(current_user: User = Depends(get_current_admin_user)):
+    """
+    Get login admission control counters (Requires Admin)
+    
+    Shows admitted and rejected login attempts, in-flight password
+    verifications and the configured limits, for tuning.
+    """
+    return login_admission.stats()
+
+@router.get("/quiz-cache")
+async def get_quiz_cache_stats(current_user: User = Depends(get_current_admin_user)):
+    """
+    Get completed quiz response cache counters (Requires Admin)
+    
+    Shows entries, bytes used against the budget, hits and misses.
+    """
+    return quiz_response_cache.stats()
+
+@router.get("/slow-requests")
+async def get_slow_requests(
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    List the slowest recently profiled requests (Requires Admin)
+    
+    Reads the profiles written by the profiling middleware (PROFILING_ENABLED),
+    slowest first, with their SQL totals and most frequent stacks. The full
+    profile is in the named file under PROFILE_DIR.
+    """
+    requests = await run_in_threadpool(list_slow_requests, limit)
+    return {"enabled": PROFILING_ENABLED, "requests": requests}
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from database import get_db, User
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, User
 from auth_models import UserRegister, UserLogin, LoginResponse, UserResponse, MessageResponse
 from controllers.auth_controller import AuthController
 from utils.auth_utils import get_current_active_user
@@ -9,7 +9,7 @@ router = APIRouter(prefix="/api/auth", tags=["authentication"])
 auth_controller = AuthController()
 
 @router.post("/register", response_model=UserResponse, status_code=201)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user
     
@@ -20,14 +20,17 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     return await auth_controller.register_user(user_data, db)
 
 @router.post("/login", response_model=LoginResponse)
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Login user and get access token
     
     - **username**: Username (required)
     - **password**: Password (required)
+    
+    Too many attempts for one username or client IP are rejected with 429.
     """
-    return await auth_controller.login_user(user_data, db)
+    client_ip = request.client.host if request.client else "unknown"
+    return await auth_controller.login_user(user_data, db, client_ip)
 
 @router.post("/logout", response_model=MessageResponse)
 async def logout(current_user: User = Depends(get_current_active_user)):
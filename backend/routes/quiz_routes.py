@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from database import get_db, User
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, User
 from quiz_models import (
     QuizAttemptCreate,
     QuizAttemptUpdate, 
@@ -9,7 +10,8 @@ from quiz_models import (
     RecentQuizResponse
 )
 from controllers.quiz_controller import QuizController
-from utils.auth_utils import get_current_active_user
+from utils.auth_utils import get_current_active_user, get_user_read_db
+from utils.pagination import MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/api/quiz", tags=["quiz"])
 quiz_controller = QuizController()
@@ -18,7 +20,8 @@ quiz_controller = QuizController()
 async def start_quiz(
     quiz_data: QuizAttemptCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     Start a new quiz attempt
@@ -26,15 +29,18 @@ async def start_quiz(
     - **topic**: Quiz topic
     - **total_questions**: Number of questions
     - **questions_data**: Array of questions with options
+    - **Idempotency-Key** (header, optional): repeating a request with the same key
+      returns the attempt created the first time instead of inserting another
     """
-    return await quiz_controller.create_quiz_attempt(quiz_data, current_user, db)
+    return await quiz_controller.create_quiz_attempt(quiz_data, current_user, db, idempotency_key)
 
 @router.put("/{quiz_id}/complete", response_model=QuizAttemptResponse)
 async def complete_quiz(
     quiz_id: int,
     quiz_update: QuizAttemptUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     Complete a quiz attempt with answers and score
@@ -43,43 +49,78 @@ async def complete_quiz(
     - **answers**: User's answers
     - **score**: Final score
     - **total_questions**: Total number of questions
+    - **Idempotency-Key** (header, optional): a resubmission with the same key
+      returns the completed attempt without recording the score again
     """
-    return await quiz_controller.complete_quiz_attempt(quiz_id, quiz_update, current_user, db)
+    return await quiz_controller.complete_quiz_attempt(quiz_id, quiz_update, current_user, db, idempotency_key)
 
 @router.get("/stats", response_model=QuizStatsResponse)
 async def get_quiz_stats(
+    response: Response,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_user_read_db),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Get quiz statistics for the current user
     
     Returns total quizzes, completed, incomplete, average score, etc.
+    Responses carry an `ETag`; send it back in `If-None-Match` to get a 304
+    while the user's quiz data hasn't changed.
     """
-    return await quiz_controller.get_user_quiz_stats(current_user, db)
+    return await quiz_controller.get_user_quiz_stats(current_user, db, if_none_match, response)
 
-@router.get("/recent", response_model=RecentQuizResponse)
+@router.get("/recent", response_model=RecentQuizResponse, response_model_exclude_unset=True)
 async def get_recent_quizzes(
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_user_read_db),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
-    Get recent quiz attempts for the current user
+    Get recent quiz attempts for the current user, newest first
     
-    - **limit**: Number of recent quizzes to return (default: 10)
+    - **limit**: Number of quizzes per page (default: 10, max: 100)
+    - **cursor**: `next_cursor` from the previous page; omit for the first page
+    - **fields**: Comma-separated heavy fields to include (`questions_data`, `answers`);
+      by default only summary columns are returned
+    
+    Responses carry an `ETag`; send it back in `If-None-Match` to get a 304
+    while the user's quiz data hasn't changed.
     """
-    return await quiz_controller.get_recent_quizzes(current_user, limit, db)
+    return await quiz_controller.get_recent_quizzes(current_user, limit, db, cursor, fields, if_none_match)
+
+@router.get("/export")
+async def export_quizzes(
+    format: str = Query("ndjson", description="`ndjson` or `csv`"),
+    current_user: User = Depends(get_current_active_user),
+    accept_encoding: Optional[str] = Header(None)
+):
+    """
+    Download the current user's full quiz history, oldest first
+    
+    - **format**: `ndjson` (one attempt per line) or `csv`
+    
+    The response is streamed in batches, and gzip-compressed when the
+    client sends `Accept-Encoding: gzip`.
+    """
+    return quiz_controller.export_quizzes(current_user, format, accept_encoding)
 
 @router.get("/{quiz_id}", response_model=QuizAttemptResponse)
 async def get_quiz_attempt(
     quiz_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Get a specific quiz attempt
     
     - **quiz_id**: ID of the quiz attempt
+    
+    Completed attempts are served from an in-memory cache with a strong
+    `ETag`; send it back in `If-None-Match` to get a 304.
     """
-    return await quiz_controller.get_quiz_attempt(quiz_id, current_user, db)
\ No newline at end of file
+    return await quiz_controller.get_quiz_attempt(quiz_id, current_user, db, if_none_match)
\ No newline at end of file
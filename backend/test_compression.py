@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Check that compressed responses get their own ETag and still revalidate
+
+Wraps a small app that answers conditional GETs the way the quiz response
+cache does with CompressionMiddleware. Runs under pytest or directly.
+"""
+
+from typing import Optional
+from fastapi import FastAPI, Header, Response
+from fastapi.testclient import TestClient
+from utils.compression import CompressionMiddleware, decoded_etag, encoded_etag
+from utils.data_version import cache_headers, etag_matches, not_modified
+from utils.response_cache import strong_etag
+
+BODY = b'{"questions": "' + b"x" * 4096 + b'"}'
+ETAG = strong_etag(BODY)
+
+def make_client():
+    app = FastAPI()
+
+    @app.get("/quiz")
+    def quiz(if_none_match: Optional[str] = Header(None)):
+        if etag_matches(if_none_match, ETAG):
+            return not_modified(ETAG)
+        return Response(BODY, media_type="application/json", headers=cache_headers(ETAG))
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return TestClient(app)
+
+def test_encoded_etag_round_trip():
+    assert encoded_etag('"abc"', "br") == '"abc-br"'
+    assert encoded_etag('"abc"', "gzip") == '"abc-gzip"'
+    assert encoded_etag('W/"stats-1-3"', "gzip") == 'W/"stats-1-3"'
+    assert decoded_etag('"abc-br"') == '"abc"'
+    assert decoded_etag('"abc-gzip"') == '"abc"'
+    assert decoded_etag('W/"abc-br"') == 'W/"abc-br"'
+    assert etag_matches('"abc-gzip"', '"abc"')
+
+def test_each_coding_has_its_own_etag():
+    client = make_client()
+    identity = client.get("/quiz", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/quiz", headers={"Accept-Encoding": "gzip"})
+    assert identity.headers["etag"] == ETAG
+    assert "content-encoding" not in identity.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == encoded_etag(ETAG, "gzip")
+    assert gzipped.content == BODY  # decoded by the client
+
+def test_compressed_etag_revalidates():
+    client = make_client()
+    etag = client.get("/quiz", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    response = client.get("/quiz", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+    # The plain validator still works, and is what comes back with the 304
+    response = client.get("/quiz", headers={"Accept-Encoding": "gzip", "If-None-Match": ETAG})
+    assert response.status_code == 304
+    assert response.headers["etag"] == ETAG
+
+def main():
+    print("🧪 Checking response compression ETags...")
+    for test in (
+        test_encoded_etag_round_trip,
+        test_each_coding_has_its_own_etag,
+        test_compressed_etag_revalidates,
+    ):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
+
+if __name__ == "__main__":
+    main()
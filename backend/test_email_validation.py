@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Check that concurrent deliverability checks for one domain share a DNS lookup
+
+The DNS check is replaced with a slow stand-in, so no network is needed.
+Runs under pytest or directly.
+"""
+
+import threading
+import time
+from utils import email_utils
+
+def test_concurrent_checks_share_one_lookup():
+    calls = []
+    real_check = email_utils._check_deliverability
+
+    def slow_check(ascii_domain, domain):
+        calls.append(ascii_domain)
+        time.sleep(0.2)
+        return True
+
+    email_utils._check_deliverability = slow_check
+    email_utils.domain_cache.clear()
+    try:
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                email_utils.is_domain_deliverable("burst.example", "burst.example")
+            ))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        email_utils._check_deliverability = real_check
+
+    assert calls == ["burst.example"]
+    assert results == [True] * 10
+    assert email_utils._lookups == {}
+
+def main():
+    print("🧪 Checking email deliverability lookups...")
+    for test in (test_concurrent_checks_share_one_lookup,):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
+
+if __name__ == "__main__":
+    main()
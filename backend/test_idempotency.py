@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Check Idempotency-Key handling on the quiz start and complete endpoints
+
+Drives the routes over HTTP against a throwaway SQLite database, with the
+database and current user dependencies pointed at it. Runs under pytest or
+directly.
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from database import Base, IdempotencyKey, QuizAttempt, User, UserQuizStats, get_async_db
+from main import app
+from utils.auth_utils import get_current_active_user
+from utils.question_sets import question_set_cache
+import controllers.quiz_controller as quiz_controller
+
+QUESTIONS = [{"question": "2 + 2?", "options": ["3", "4"], "correct_answer": "4"}]
+START_BODY = {"topic": "Arithmetic", "total_questions": 1, "questions_data": QUESTIONS}
+COMPLETE_BODY = {"answers": [{"question": 0, "answer": "4"}], "score": 1, "total_questions": 1}
+
+def make_client():
+    """A client whose requests run as a fresh user against a fresh database; returns (client, Session)"""
+    path = os.path.join(tempfile.mkdtemp(prefix="idempotency_"), "idempotency.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as db:
+        user = User(username="idem_user", email="idem@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+
+    async_engine = create_async_engine(engine.url.set(drivername="sqlite+aiosqlite"), poolclass=NullPool)
+    AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_db():
+        async with AsyncSession() as db:
+            yield db
+
+    # Cached question set ids belong to whichever database filled the cache
+    question_set_cache.clear()
+    app.dependency_overrides[get_async_db] = override_db
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    return TestClient(app), Session
+
+def count_attempts(Session) -> int:
+    with Session() as db:
+        return db.scalar(select(func.count(QuizAttempt.id)))
+
+def start(client, body=START_BODY, key="start-1"):
+    return client.post("/api/quiz/start", json=body, headers={"Idempotency-Key": key})
+
+def test_same_key_and_body_replays_attempt():
+    client, Session = make_client()
+    try:
+        first = start(client)
+        second = start(client)
+        assert first.status_code == 201, first.text
+        assert second.status_code == 201, second.text
+        assert second.json()["id"] == first.json()["id"]
+        assert count_attempts(Session) == 1
+
+        quiz_id = first.json()["id"]
+        headers = {"Idempotency-Key": "complete-1"}
+        for _ in range(2):
+            response = client.put(f"/api/quiz/{quiz_id}/complete", json=COMPLETE_BODY, headers=headers)
+            assert response.status_code == 200, response.text
+        # The replayed completion must not count the score a second time
+        with Session() as db:
+            stats = db.get(UserQuizStats, first.json()["user_id"])
+        assert (stats.completed_quizzes, stats.score_count, stats.score_sum) == (1, 1, 1)
+    finally:
+        app.dependency_overrides.clear()
+
+def test_same_key_different_body_is_rejected():
+    client, Session = make_client()
+    try:
+        assert start(client).status_code == 201
+        response = start(client, {**START_BODY, "topic": "Geography"})
+        assert response.status_code == 422, response.text
+        assert count_attempts(Session) == 1
+    finally:
+        app.dependency_overrides.clear()
+
+def test_concurrent_duplicate_resolves_via_unique_key():
+    client, Session = make_client()
+    real_find_replay = quiz_controller.find_replay
+    calls = []
+
+    def racing_find_replay(*args):
+        # The first lookup misses, as it would for a request racing the
+        # original; the insert then hits the unique index and must replay
+        calls.append(args)
+        if len(calls) == 1:
+            return None
+        return real_find_replay(*args)
+
+    try:
+        first = start(client)
+        assert first.status_code == 201, first.text
+        quiz_controller.find_replay = racing_find_replay
+        second = start(client)
+        assert second.status_code == 201, second.text
+        assert len(calls) == 2, "duplicate insert did not fall back to a replay"
+        assert second.json()["id"] == first.json()["id"]
+        assert count_attempts(Session) == 1
+    finally:
+        quiz_controller.find_replay = real_find_replay
+        app.dependency_overrides.clear()
+
+def test_expired_key_is_ignored():
+    client, Session = make_client()
+    try:
+        first = start(client)
+        assert first.status_code == 201, first.text
+        with Session() as db:
+            db.execute(update(IdempotencyKey).values(
+                expires_at=datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=1)
+            ))
+            db.commit()
+
+        second = start(client)
+        assert second.status_code == 201, second.text
+        assert second.json()["id"] != first.json()["id"]
+        assert count_attempts(Session) == 2
+        # The expired record was replaced by one for the new attempt
+        with Session() as db:
+            keys = db.scalars(select(IdempotencyKey)).all()
+        assert [k.quiz_attempt_id for k in keys] == [second.json()["id"]]
+    finally:
+        app.dependency_overrides.clear()
+
+def main():
+    print("🧪 Checking quiz idempotency keys...")
+    for test in (
+        test_same_key_and_body_replays_attempt,
+        test_same_key_different_body_is_rejected,
+        test_concurrent_duplicate_resolves_via_unique_key,
+        test_expired_key_is_ignored,
+    ):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
+
+if __name__ == "__main__":
+    main()
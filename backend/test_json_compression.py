@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Check the compressed JSON column type and the legacy row converter
+
+Uses a throwaway SQLite database holding a mix of plain-JSON rows (as written
+before compression) and new compressed ones. Runs under pytest or directly.
+"""
+
+import json
+import os
+import tempfile
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from database import Base, User, QuizAttempt
+from utils.json_compression import (
+    CODEC_RAW, CODEC_ZLIB, COMPRESSED_COLUMNS, MAGIC, convert_table, decode_json, encode_json
+)
+
+ANSWERS = json.dumps([
+    {"question_index": i, "user_answer": "Option A", "is_correct": i % 2 == 0} for i in range(20)
+])
+
+def make_database():
+    path = os.path.join(tempfile.mkdtemp(prefix="json_compression_"), "compression.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    user = User(username="compress_user", email="compress@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+
+    # Legacy rows: plain JSON text written straight to the table
+    with engine.begin() as conn:
+        for i in range(5):
+            conn.execute(
+                text("INSERT INTO quiz_attempts (user_id, topic, total_questions, questions_data, answers, status) "
+                     "VALUES (:user_id, :topic, 20, :questions, :answers, 'completed')"),
+                {"user_id": user.id, "topic": f"Legacy {i}", "questions": json.dumps([]), "answers": ANSWERS}
+            )
+    db.add(QuizAttempt(user_id=user.id, topic="New", total_questions=20, questions_data="[]", answers=ANSWERS))
+    db.commit()
+    db.close()
+    return engine, Session
+
+def raw_answers(engine):
+    with engine.connect() as conn:
+        return [row[0] for row in conn.execute(text("SELECT answers FROM quiz_attempts ORDER BY id"))]
+
+def test_round_trip():
+    small = "[1, 2, 3]"
+    assert encode_json(small)[len(MAGIC) + 1] == CODEC_RAW
+    assert decode_json(encode_json(small)) == small
+
+    encoded = encode_json(ANSWERS)
+    assert encoded.startswith(MAGIC) and encoded[len(MAGIC) + 1] == CODEC_ZLIB
+    assert len(encoded) < len(ANSWERS)
+    assert decode_json(encoded) == ANSWERS
+    assert decode_json(ANSWERS) == ANSWERS
+    assert decode_json(ANSWERS.encode("utf-8")) == ANSWERS
+
+def test_legacy_and_new_rows_read_the_same():
+    engine, Session = make_database()
+    raw = raw_answers(engine)
+    assert [isinstance(r, str) for r in raw] == [True] * 5 + [False]
+
+    db = Session()
+    assert [a.answers for a in db.query(QuizAttempt).order_by(QuizAttempt.id)] == [ANSWERS] * 6
+    db.close()
+
+def test_converter_rewrites_legacy_rows_once():
+    engine, Session = make_database()
+    columns = COMPRESSED_COLUMNS["quiz_attempts"]
+
+    stats = convert_table(engine, "quiz_attempts", columns, batch_size=2, verbose=False)
+    assert stats["converted"] == 10, stats  # questions_data and answers of the 5 legacy rows
+    assert stats["bytes_after"] < stats["bytes_before"]
+    assert all(bytes(r).startswith(MAGIC) for r in raw_answers(engine))
+
+    db = Session()
+    assert [a.answers for a in db.query(QuizAttempt)] == [ANSWERS] * 6
+    db.close()
+
+    assert convert_table(engine, "quiz_attempts", columns, verbose=False)["converted"] == 0
+
+def main():
+    print("🧪 Checking compressed JSON columns...")
+    for test in (
+        test_round_trip,
+        test_legacy_and_new_rows_read_the_same,
+        test_converter_rewrites_legacy_rows_once,
+    ):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Check the metrics primitives and the SQLAlchemy engine instrumentation
+
+Records from several threads to make sure the per-thread shards add up, and
+runs a few statements on a throwaway SQLite engine. Runs under pytest or
+directly.
+"""
+
+import os
+import tempfile
+import threading
+from sqlalchemy import create_engine, text
+from utils.metrics import (
+    DB_POOL_CHECKOUT, DB_QUERY_DURATION, DB_QUERY_ERRORS, Counter, Histogram, instrument_engine, render_metrics
+)
+
+def sample_value(metric, sample_name, labels):
+    return {(name, sample_labels): value for name, sample_labels, value in metric.samples()}.get((sample_name, labels))
+
+def test_shards_add_up_across_threads():
+    counter = Counter("test_shard_total", "Test counter", ("kind",))
+    histogram = Histogram("test_shard_seconds", "Test histogram", ("kind",), buckets=(0.1, 1.0))
+
+    def record():
+        for _ in range(1000):
+            counter.inc(("a",))
+            histogram.observe(0.5, ("a",))
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sample_value(counter, "test_shard_total", ("a",)) == 4000
+    assert sample_value(histogram, "test_shard_seconds_bucket", ("a", "0.1")) == 0
+    assert sample_value(histogram, "test_shard_seconds_bucket", ("a", "1.0")) == 4000
+    assert sample_value(histogram, "test_shard_seconds_bucket", ("a", "+Inf")) == 4000
+    assert sample_value(histogram, "test_shard_seconds_count", ("a",)) == 4000
+    assert abs(sample_value(histogram, "test_shard_seconds_sum", ("a",)) - 2000) < 1e-6
+
+def test_render_uses_prometheus_text_format():
+    histogram = Histogram("test_render_seconds", "Render test", ("route",), buckets=(1.0,))
+    histogram.observe(0.5, ('/a"b',))
+    output = render_metrics()
+    assert "# TYPE test_render_seconds histogram" in output
+    assert 'test_render_seconds_bucket{route="/a\\"b",le="1.0"} 1' in output
+    assert 'test_render_seconds_count{route="/a\\"b"} 1' in output
+
+def test_engine_statements_and_checkouts_are_recorded():
+    path = os.path.join(tempfile.mkdtemp(prefix="metrics_"), "metrics.db")
+    engine = create_engine(f"sqlite:///{path}")
+    instrument_engine(engine, "test")
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO t (id) VALUES (1)"))
+        conn.execute(text("SELECT id FROM t")).all()
+        try:
+            conn.execute(text("SELECT missing FROM t"))
+        except Exception:
+            pass
+
+    assert sample_value(DB_QUERY_DURATION, "db_query_duration_seconds_count", ("test", "SELECT")) == 1
+    assert sample_value(DB_QUERY_DURATION, "db_query_duration_seconds_count", ("test", "INSERT")) == 1
+    assert sample_value(DB_QUERY_ERRORS, "db_query_errors_total", ("test", "SELECT")) == 1
+    assert sample_value(DB_POOL_CHECKOUT, "db_pool_checkout_seconds_count", ("test",)) == 1
+
+    # dispose() replaces the pool; checkouts from the new one are still timed
+    engine.dispose()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert sample_value(DB_POOL_CHECKOUT, "db_pool_checkout_seconds_count", ("test",)) == 2
+
+def main():
+    print("🧪 Checking metrics...")
+    for test in (
+        test_shards_add_up_across_threads,
+        test_render_uses_prometheus_text_format,
+        test_engine_statements_and_checkouts_are_recorded,
+    ):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Check request profile rotation and the slow-request listing
+
+Writes profiles to a throwaway directory. Runs under pytest or directly.
+"""
+
+import os
+import tempfile
+import time
+from utils.profiling import StackSampler, list_slow_requests, write_profile
+
+def make_profile(path, duration_ms):
+    return {
+        "method": "GET", "path": path, "status": 200, "duration_ms": duration_ms,
+        "started_at": time.time(), "reason": "slow", "sql_count": 0, "sql_total_ms": 0,
+        "sql": [], "interval_ms": 5, "stacks": [{"stack": "MainThread;handler (x.py:1)", "samples": 3}],
+    }
+
+def test_rotation_keeps_newest_files():
+    directory = tempfile.mkdtemp(prefix="profiles_")
+    for i in range(5):
+        write_profile(make_profile(f"/api/quiz/{i}", 100 + i), directory, max_files=3)
+        time.sleep(0.002)  # file names start with a millisecond timestamp
+    paths = sorted(p["path"] for p in list_slow_requests(10, directory))
+    assert paths == ["/api/quiz/2", "/api/quiz/3", "/api/quiz/4"]
+
+def test_listing_is_slowest_first():
+    directory = tempfile.mkdtemp(prefix="profiles_")
+    for path, duration_ms in (("/api/quiz/recent", 1500.5), ("/api/auth/login", 2400.0), ("/", 900.0)):
+        write_profile(make_profile(path, duration_ms), directory)
+    listed = list_slow_requests(2, directory)
+    assert [p["path"] for p in listed] == ["/api/auth/login", "/api/quiz/recent"]
+    assert listed[0]["top_stacks"][0]["samples"] == 3
+    assert list_slow_requests(5, os.path.join(directory, "missing")) == []
+
+def test_sampler_collects_stacks_while_active():
+    sampler = StackSampler(interval_ms=1)
+    sampler.acquire()
+    start = time.perf_counter()
+    deadline = start + 0.05
+    while time.perf_counter() < deadline:
+        pass  # busy, so this thread shows up in the samples
+    end = time.perf_counter()
+    sampler.release()
+    stacks = sampler.collapsed_stacks(start, end)
+    assert any("test_sampler_collects_stacks_while_active" in s["stack"] for s in stacks)
+
+def main():
+    print("🧪 Checking request profiling...")
+    for test in (
+        test_rotation_keeps_newest_files,
+        test_listing_is_slowest_first,
+        test_sampler_collects_stacks_while_active,
+    ):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
+
+if __name__ == "__main__":
+    main()
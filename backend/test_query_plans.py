@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Check that the hot quiz queries use the quiz_attempts composite indexes
+
+Builds a throwaway SQLite database with the pre-index schema, applies the
+versioned migrations, then runs the quiz controller queries and inspects
+their EXPLAIN QUERY PLAN output. Runs under pytest or directly.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from database import Base, User, QuizAttempt
+from controllers.quiz_controller import QuizController
+from utils.migrations import run_migrations, applied_versions
+from utils.quiz_stats import compute_user_stats
+from utils.analytics_export import export_query
+
+INDEXES = ("ix_quiz_attempts_user_created", "ix_quiz_attempts_user_status")
+
+def make_legacy_database():
+    """A database shaped like one created before migration 0001"""
+    path = os.path.join(tempfile.mkdtemp(prefix="query_plans_"), "plans.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for index in INDEXES:
+            conn.execute(text(f"DROP INDEX {index}"))
+
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    for n in range(3):
+        user = User(username=f"plan_user_{n}", email=f"plan{n}@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        for i in range(50):
+            db.add(QuizAttempt(
+                user_id=user.id,
+                topic=f"Topic {i}",
+                total_questions=5,
+                questions_data=json.dumps([]),
+                score=i % 6,
+                percentage=(i % 6) * 20.0,
+                status="completed" if i % 3 else "incomplete"
+            ))
+    db.commit()
+    db.close()
+    return engine
+
+def query_plans(engine, run, capture_engine=None):
+    """Run `run(db)` and return (sql, plan) for every quiz_attempts statement it issues"""
+    statements = []
+    capture_engine = capture_engine or engine
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM quiz_attempts" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(capture_engine, "before_cursor_execute", capture)
+    db = sessionmaker(bind=engine)()
+    try:
+        run(db)
+    finally:
+        db.close()
+        event.remove(capture_engine, "before_cursor_execute", capture)
+
+    plans = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            plans.append((statement, " | ".join(row[-1] for row in rows)))
+    return plans
+
+def controller_plans(engine, run):
+    """Like query_plans, but `run(db, user)` is a coroutine using an async session, as the routes do"""
+    async_engine = create_async_engine(
+        engine.url.set(drivername="sqlite+aiosqlite"), poolclass=NullPool
+    )
+
+    async def go():
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            user = await db.scalar(select(User).order_by(User.id))
+            await run(db, user)
+
+    try:
+        return query_plans(engine, lambda db: asyncio.run(go()), async_engine.sync_engine)
+    finally:
+        asyncio.run(async_engine.dispose())
+
+_engine = None
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = make_legacy_database()
+        run_migrations(_engine, verbose=False)
+    return _engine
+
+def test_migration_creates_indexes():
+    engine = get_engine()
+    assert 1 in applied_versions(engine)
+    with engine.connect() as conn:
+        names = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+    for index in INDEXES:
+        assert index in names, f"{index} missing after migration"
+
+def test_recent_quizzes_use_user_created_index():
+    engine = get_engine()
+
+    async def run(db, user):
+        await QuizController().get_recent_quizzes(user, 10, db)
+
+    plans = [plan for sql, plan in controller_plans(engine, run) if "ORDER BY" in sql]
+    assert plans, "recent quizzes query not captured"
+    for plan in plans:
+        assert "ix_quiz_attempts_user_created" in plan, plan
+        assert "TEMP B-TREE" not in plan, f"recent quizzes sort without the index: {plan}"
+
+def test_recent_quizzes_deep_page_uses_index_range():
+    engine = get_engine()
+    controller = QuizController()
+
+    async def run(db, user):
+        first_page = await controller.get_recent_quizzes(user, 10, db)
+        await controller.get_recent_quizzes(user, 10, db, json.loads(first_page.body)["next_cursor"])
+
+    plans = [plan for sql, plan in controller_plans(engine, run) if "ORDER BY" in sql]
+    assert len(plans) == 2, "paged queries not captured"
+    for plan in plans:
+        assert "ix_quiz_attempts_user_created" in plan, plan
+        assert "TEMP B-TREE" not in plan, f"paged query sorts without the index: {plan}"
+
+def test_stats_aggregate_uses_user_index():
+    engine = get_engine()
+    plans = query_plans(engine, lambda db: compute_user_stats(db, 1))
+    assert plans, "stats query not captured"
+    for sql, plan in plans:
+        assert "USING INDEX ix_quiz_attempts_user_" in plan or "USING COVERING INDEX ix_quiz_attempts_user_" in plan, plan
+
+def test_incremental_export_uses_updated_index():
+    engine = get_engine()
+    since = {"updated_at": "2000-01-01T00:00:00", "id": 0}
+    plans = query_plans(engine, lambda db: db.execute(export_query("quiz_attempts", since)).all())
+    assert plans, "export query not captured"
+    for sql, plan in plans:
+        assert "ix_quiz_attempts_updated" in plan, plan
+        assert "TEMP B-TREE" not in plan, f"export query sorts without the index: {plan}"
+
+def main():
+    print("🧪 Checking quiz query plans...")
+    for test in (
+        test_migration_creates_indexes,
+        test_recent_quizzes_use_user_created_index,
+        test_recent_quizzes_deep_page_uses_index_range,
+        test_stats_aggregate_uses_user_index,
+        test_incremental_export_uses_updated_index,
+    ):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Check the incrementally maintained quiz stats against a full recount
+
+Applies creates, completions and retakes to a throwaway SQLite database the
+way the quiz controller does, and after every step compares the
+user_quiz_stats row with compute_user_stats. Runs under pytest or directly.
+"""
+
+import os
+import tempfile
+from datetime import datetime, timezone
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base, QuizAttempt, User, UserQuizStats
+from quiz_models import QuizStatus
+from utils.quiz_stats import compute_user_stats, record_attempt_completed, record_attempt_created
+
+COMPLETED = QuizStatus.COMPLETED.value
+INCOMPLETE = QuizStatus.INCOMPLETE.value
+TOTAL_QUESTIONS = 10
+
+def make_session():
+    path = os.path.join(tempfile.mkdtemp(prefix="quiz_stats_"), "stats.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    user = User(username="stats_user", email="stats@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return db, user.id
+
+def create(db, user_id, score=None):
+    """Start an attempt, already completed with `score` if one is given"""
+    status = COMPLETED if score is not None else INCOMPLETE
+    attempt = QuizAttempt(
+        user_id=user_id, topic="Stats", total_questions=TOTAL_QUESTIONS, status=status,
+        score=score, percentage=score * 100 / TOTAL_QUESTIONS if score is not None else None
+    )
+    db.add(attempt)
+    record_attempt_created(db, user_id, attempt.status, attempt.score, attempt.percentage)
+    db.commit()
+    return attempt
+
+def complete(db, user_id, attempt, score):
+    """Complete, or retake, an attempt"""
+    previous = (attempt.status, attempt.score, attempt.percentage)
+    attempt.status = COMPLETED
+    attempt.score = score
+    attempt.percentage = score * 100 / TOTAL_QUESTIONS
+    attempt.completed_at = datetime.now(timezone.utc)
+    record_attempt_completed(db, user_id, *previous, attempt.score, attempt.percentage)
+    db.commit()
+
+def stats_row(db, user_id) -> UserQuizStats:
+    return db.get(UserQuizStats, user_id, populate_existing=True)
+
+def assert_matches_recount(db, user_id):
+    stats = stats_row(db, user_id)
+    assert stats is not None, "stats row missing"
+    for key, expected in compute_user_stats(db, user_id).items():
+        actual = getattr(stats, key)
+        if isinstance(expected, float):
+            assert abs(actual - expected) < 1e-9, f"{key}: {actual} != {expected}"
+        else:
+            assert actual == expected, f"{key}: {actual} != {expected}"
+
+def test_sequence_matches_recount():
+    db, user_id = make_session()
+    try:
+        first = create(db, user_id)
+        assert_matches_recount(db, user_id)
+        versions = [stats_row(db, user_id).data_version]
+
+        steps = [
+            lambda: create(db, user_id, score=5),
+            lambda: complete(db, user_id, first, 8),
+            lambda: create(db, user_id),
+            lambda: create(db, user_id, score=3),
+        ]
+        for step in steps:
+            step()
+            assert_matches_recount(db, user_id)
+            versions.append(stats_row(db, user_id).data_version)
+        assert versions == list(range(versions[0], versions[0] + len(versions))), versions
+
+        stats = stats_row(db, user_id)
+        assert (stats.total_quizzes, stats.completed_quizzes) == (4, 3)
+        assert (stats.highest_score, stats.lowest_score) == (8, 3)
+    finally:
+        db.close()
+
+def test_retake_of_middle_score_updates_in_place():
+    db, user_id = make_session()
+    try:
+        create(db, user_id, score=8)
+        middle = create(db, user_id, score=5)
+        create(db, user_id, score=3)
+        version = stats_row(db, user_id).data_version
+
+        complete(db, user_id, middle, 6)
+        assert_matches_recount(db, user_id)
+        stats = stats_row(db, user_id)
+        assert stats.data_version == version + 1
+        assert (stats.score_sum, stats.score_count) == (17, 3)
+    finally:
+        db.close()
+
+def test_retake_replacing_max_or_min_rebuilds():
+    db, user_id = make_session()
+    try:
+        highest = create(db, user_id, score=8)
+        create(db, user_id, score=5)
+        lowest = create(db, user_id, score=3)
+
+        # Dropping the best score: the runner-up (5) must become the maximum
+        version = stats_row(db, user_id).data_version
+        complete(db, user_id, highest, 4)
+        assert_matches_recount(db, user_id)
+        stats = stats_row(db, user_id)
+        assert (stats.highest_score, stats.lowest_score) == (5, 3)
+        assert stats.data_version == version + 1
+
+        # Raising the worst score: the runner-up (4) must become the minimum
+        complete(db, user_id, lowest, 9)
+        assert_matches_recount(db, user_id)
+        stats = stats_row(db, user_id)
+        assert (stats.highest_score, stats.lowest_score) == (9, 4)
+        assert stats.data_version == version + 2
+    finally:
+        db.close()
+
+def test_missing_row_is_rebuilt():
+    db, user_id = make_session()
+    try:
+        attempt = create(db, user_id)
+        create(db, user_id, score=7)
+        # Rows predating the stats table, or lost, are rebuilt on the next write
+        db.query(UserQuizStats).filter(UserQuizStats.user_id == user_id).delete()
+        db.commit()
+
+        complete(db, user_id, attempt, 6)
+        assert_matches_recount(db, user_id)
+        assert stats_row(db, user_id).completed_quizzes == 2
+
+        # Same for a retake, which reads the row before deciding how to update it
+        db.query(UserQuizStats).filter(UserQuizStats.user_id == user_id).delete()
+        db.commit()
+        complete(db, user_id, attempt, 2)
+        assert_matches_recount(db, user_id)
+        assert stats_row(db, user_id).lowest_score == 2
+    finally:
+        db.close()
+
+def main():
+    print("🧪 Checking incremental quiz stats...")
+    for test in (
+        test_sequence_matches_recount,
+        test_retake_of_middle_score_updates_in_place,
+        test_retake_replacing_max_or_min_rebuilds,
+        test_missing_row_is_rebuilt,
+    ):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
+
+if __name__ == "__main__":
+    main()
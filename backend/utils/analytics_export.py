@@ -0,0 +1,148 @@
+import csv
+import gzip
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Sequence
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+from database import QuestionSet, QuizAttempt, User
+
+# Columns exported per table. Password hashes are never exported.
+EXPORT_COLUMNS = {
+    "quiz_attempts": (
+        QuizAttempt.id,
+        QuizAttempt.user_id,
+        QuizAttempt.topic,
+        QuizAttempt.total_questions,
+        QuizAttempt.score,
+        QuizAttempt.percentage,
+        QuizAttempt.status,
+        QuizAttempt.question_set_id,
+        func.coalesce(QuestionSet.questions_data, QuizAttempt.questions_json).label("questions_data"),
+        QuizAttempt.answers,
+        QuizAttempt.created_at,
+        QuizAttempt.completed_at,
+        QuizAttempt.updated_at,
+    ),
+    "users": (
+        User.id,
+        User.username,
+        User.email,
+        User.is_active,
+        User.created_at,
+        User.updated_at,
+    ),
+}
+MODELS = {"quiz_attempts": QuizAttempt, "users": User}
+
+FORMATS = ("csv", "parquet")
+WATERMARK_FILE = "_watermarks.json"
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+def export_query(table: str, since: Optional[dict] = None, until: Optional[datetime] = None):
+    """Rows of `table` in (updated_at, id) order, optionally after a watermark and up to a cutoff"""
+    model = MODELS[table]
+    query = select(*EXPORT_COLUMNS[table]).select_from(model)
+    if table == "quiz_attempts":
+        query = query.outerjoin(QuestionSet, QuizAttempt.question_set_id == QuestionSet.id)
+    if since:
+        updated_at = datetime.fromisoformat(since["updated_at"])
+        query = query.where(or_(
+            model.updated_at > updated_at,
+            (model.updated_at == updated_at) & (model.id > since["id"])
+        ))
+    if until is not None:
+        query = query.where(model.updated_at <= until)
+    return query.order_by(model.updated_at, model.id)
+
+def stream_rows(db: Session, query, chunk_size: int) -> Iterator[Sequence]:
+    """Yield lists of rows from a server-side cursor, `chunk_size` at a time"""
+    result = db.execute(query.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        yield rows
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def write_csv_part(path: str, columns: List[str], rows) -> str:
+    path += ".csv.gz"
+    with gzip.open(path, "wt", encoding="utf-8", newline="", compresslevel=6) as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows([_value(value) for value in row] for row in rows)
+    return path
+
+def write_parquet_part(path: str, columns: List[str], rows) -> str:
+    pa = _pyarrow()
+    path += ".parquet"
+    table = pa.table({name: [row[i] for row in rows] for i, name in enumerate(columns)})
+    pa.parquet.write_table(table, path, compression="zstd")
+    return path
+
+WRITERS = {"csv": write_csv_part, "parquet": write_parquet_part}
+
+def load_watermarks(out_dir: str) -> dict:
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_watermarks(out_dir: str, watermarks: dict):
+    # Write then rename, so an interrupted run never leaves a half-written file
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(watermarks, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def export_table(
+    db: Session,
+    table: str,
+    out_dir: str,
+    fmt: str = "csv",
+    chunk_size: int = 50000,
+    since: Optional[dict] = None,
+    settle_seconds: int = 5,
+    verbose: bool = True
+) -> dict:
+    """
+    Export one table as a new partition directory of part files, one per chunk.
+
+    Rows updated in the last `settle_seconds` are left for the next run, so
+    a write still committing as the export starts isn't skipped past.
+    Returns the run summary, including the watermark to resume from.
+    """
+    if fmt == "parquet" and _pyarrow() is None:
+        raise RuntimeError("Parquet export needs the pyarrow package (pip install pyarrow); use --format csv")
+
+    started = datetime.now(timezone.utc).replace(tzinfo=None)
+    until = started - timedelta(seconds=settle_seconds)
+    query = export_query(table, since, until)
+    columns = list(query.selected_columns.keys())
+    updated_index = columns.index("updated_at")
+
+    partition = os.path.join(out_dir, table, f"{'incremental' if since else 'full'}-{started:%Y%m%dT%H%M%S}")
+    os.makedirs(partition, exist_ok=True)
+
+    rows_written = 0
+    files = []
+    watermark = since
+    for part, rows in enumerate(stream_rows(db, query, chunk_size)):
+        files.append(WRITERS[fmt](os.path.join(partition, f"part-{part:05d}"), columns, rows))
+        rows_written += len(rows)
+        last = rows[-1]
+        watermark = {"updated_at": last[updated_index].isoformat(), "id": last.id}
+        if verbose:
+            print(f"   ↳ {table}: {rows_written} rows, {len(files)} files")
+
+    if not files:
+        os.rmdir(partition)
+    return {"table": table, "rows": rows_written, "files": files, "partition": partition if files else None, "watermark": watermark}
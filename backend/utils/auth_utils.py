@@ -1,11 +1,10 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from database import get_db, User
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, AsyncSessionLocal, AsyncReadSessionLocal, should_read_primary, User
 from auth_models import TokenData
 import os
 from dotenv import load_dotenv
@@ -17,15 +16,29 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Comma-separated usernames allowed to use the admin endpoints
+ADMIN_USERNAMES = {
+    name.strip() for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name.strip()
+}
+
+# Password hashing (each extra round doubles the cost of hashing and verifying)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+_pwd_context = None
+
+def get_pwd_context():
+    """The passlib context, built on first use so importing this module stays cheap"""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+    return _pwd_context
 
 # Token security
 security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
@@ -35,10 +48,11 @@ def get_password_hash(password: str) -> str:
         # Truncate to 72 bytes, ensuring we don't break UTF-8 encoding
         password = password_bytes[:72].decode('utf-8', errors='ignore')
     
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -51,6 +65,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Verify JWT token"""
+    from jose import JWTError, jwt
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -68,9 +83,9 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     
     return token_data
 
-def get_current_user(token_data: TokenData = Depends(verify_token), db: Session = Depends(get_db)):
+async def get_current_user(token_data: TokenData = Depends(verify_token), db: AsyncSession = Depends(get_async_db)):
     """Get current authenticated user"""
-    user = db.query(User).filter(User.username == token_data.username).first()
+    user = await db.scalar(select(User).where(User.username == token_data.username))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -83,4 +98,19 @@ def get_current_active_user(current_user: User = Depends(get_current_user)):
     """Get current active user"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+def get_current_admin_user(current_user: User = Depends(get_current_active_user)):
+    """Get current user and require admin rights"""
+    if current_user.username not in ADMIN_USERNAMES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
+
+async def get_user_read_db(current_user: User = Depends(get_current_active_user)):
+    """Async session for read-only endpoints: the replica, unless this user has just written"""
+    session = AsyncSessionLocal() if should_read_primary(current_user.id) else AsyncReadSessionLocal()
+    async with session as db:
+        yield db
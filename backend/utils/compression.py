@@ -0,0 +1,195 @@
+import os
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Response compression configuration
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Brotli is optional; without it clients get gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Already-compressed or binary bodies gain nothing from another pass
+INCOMPRESSIBLE_PREFIXES = ("image/", "audio/", "video/", "application/zip", "application/gzip")
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header, preferring brotli; None for identity"""
+    offered = {}
+    for part in accept_encoding.split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    pass
+        offered[coding.lower()] = q
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    scored = [(offered.get(c, offered.get("*", 0)), -i, c) for i, c in enumerate(candidates)]
+    q, _, coding = max(scored)
+    return coding if q > 0 else None
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    Tag a strong ETag with the content coding, e.g. "abc" -> "abc-br".
+
+    A strong validator promises identical bytes, so the identity, gzip and br
+    bodies each need their own. Weak ETags already only promise equivalent
+    content and are returned unchanged.
+    """
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+def decoded_etag(etag: str) -> str:
+    """Undo encoded_etag, so a validator for any coding matches the uncompressed one"""
+    for encoding in ("br", "gzip"):
+        suffix = f'-{encoding}"'
+        if not etag.startswith("W/") and etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._br = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it, so streamed bodies keep streaming"""
+        if self._br is not None:
+            return self._br.process(data) + self._br.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def compress_whole(self, data: bytes) -> bytes:
+        """Compress a complete body in one go"""
+        if self._br is not None:
+            return self._br.process(data) + self._br.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+    def finish(self) -> bytes:
+        return self._br.finish() if self._br is not None else self._zlib.flush()
+
+class CompressionMiddleware:
+    """
+    gzip or brotli for responses of at least `minimum_size` bytes.
+
+    Complete bodies under the threshold, bodies that already have a
+    Content-Encoding (like the gzip export stream) and 304s pass through.
+    Streamed bodies are compressed chunk by chunk. A strong ETag on a
+    compressed response gets the coding appended (see encoded_etag).
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESSION_MIN_BYTES,
+        gzip_level: int = GZIP_LEVEL,
+        brotli_quality: int = BROTLI_QUALITY
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or message["status"] < 200
+                    or message["status"] in (204, 304)
+                    or content_type.startswith(INCOMPRESSIBLE_PREFIXES)
+                ):
+                    passthrough = True
+                    if message["status"] == 304:
+                        self._echo_encoded_etag(message, request_headers, encoding)
+                    await send(message)
+                else:
+                    # Hold the headers until the first body chunk shows the size
+                    start = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers = MutableHeaders(scope=start)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "etag" in headers:
+                    headers["ETag"] = encoded_etag(headers["etag"], encoding)
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start)
+                else:
+                    body = compressor.compress_whole(body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+            data = compressor.compress(body)
+            if not more_body:
+                data += compressor.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _echo_encoded_etag(message, request_headers: Headers, encoding: str):
+        """
+        A 304 carries the validator of the response it stands for.
+
+        The handler only knows the uncompressed ETag; if the client
+        revalidated the compressed one, send that back instead.
+        """
+        headers = MutableHeaders(scope=message)
+        etag = headers.get("etag")
+        if etag is None:
+            return
+        encoded = encoded_etag(etag, encoding)
+        if_none_match = request_headers.get("if-none-match", "")
+        if encoded != etag and encoded in [tag.strip() for tag in if_none_match.split(",")]:
+            headers["ETag"] = encoded
@@ -0,0 +1,88 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from fastapi import Response
+from utils.compression import decoded_etag
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Per-user data version cache configuration
+DATA_VERSION_CACHE_SIZE = int(os.getenv("DATA_VERSION_CACHE_SIZE", "10000"))
+# Writes made by other processes (other workers, maintenance scripts) are
+# noticed once a cached version is this old
+DATA_VERSION_TTL_SECONDS = float(os.getenv("DATA_VERSION_TTL_SECONDS", "30"))
+
+class DataVersionCache:
+    """
+    Bounded LRU of user id -> the data version last served to that user.
+
+    The version itself lives in user_quiz_stats.data_version and is bumped
+    in the same transaction as every quiz write. Caching it lets a
+    conditional GET be answered with 304 before any query runs.
+    """
+
+    def __init__(self, max_size: int = DATA_VERSION_CACHE_SIZE, ttl: float = DATA_VERSION_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            version, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return version
+
+    def set(self, user_id: int, version: int):
+        with self._lock:
+            self._entries[user_id] = (version, time.monotonic())
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        """Forget a user's version after they write; the next read reloads it"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+data_versions = DataVersionCache()
+
+def make_etag(kind: str, user_id: int, version: int) -> str:
+    # Weak: the same version always means the same data, not the same bytes
+    return f'W/"{kind}-{user_id}-{version}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match comparison (weak, as RFC 9110 requires for this header).
+
+    Also accepts the coding-suffixed tags CompressionMiddleware sends for
+    compressed responses.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        decoded_etag(tag.strip()).removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+def cache_headers(etag: str) -> dict:
+    # Browsers keep the response but revalidate it on every request
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from email_validator import validate_email, EmailNotValidError, EmailUndeliverableError
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Email validation configuration
+# "syntax" only checks the address format and never touches the network.
+# "deliverability" additionally checks the domain's MX/A records over DNS.
+EMAIL_VALIDATION_MODE = os.getenv("EMAIL_VALIDATION_MODE", "syntax").lower()
+EMAIL_DNS_TIMEOUT = float(os.getenv("EMAIL_DNS_TIMEOUT", "2"))
+EMAIL_DNS_CACHE_TTL = int(os.getenv("EMAIL_DNS_CACHE_TTL", "3600"))
+EMAIL_DNS_CACHE_SIZE = int(os.getenv("EMAIL_DNS_CACHE_SIZE", "10000"))
+
+class DomainDeliverabilityCache:
+    """Per-domain TTL cache of DNS deliverability results"""
+
+    def __init__(self, ttl: int = EMAIL_DNS_CACHE_TTL, max_size: int = EMAIL_DNS_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: Dict[str, Tuple[float, bool]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, domain: str) -> Optional[bool]:
+        """Return the cached result for a domain, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(domain)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def set(self, domain: str, deliverable: bool):
+        """Store a result for a domain"""
+        with self._lock:
+            if len(self._entries) >= self.max_size and domain not in self._entries:
+                # Dicts keep insertion order, so the first key is the oldest entry
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[domain] = (time.monotonic() + self.ttl, deliverable)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+domain_cache = DomainDeliverabilityCache()
+
+def _resolver():
+    """Build a private resolver so the timeout doesn't leak into dnspython's default one"""
+    import dns.resolver
+    resolver = dns.resolver.Resolver()
+    resolver.lifetime = EMAIL_DNS_TIMEOUT
+    return resolver
+
+class _Lookup:
+    """One in-flight DNS check that concurrent registrations for the same domain wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[bool] = None
+
+_lookups: Dict[str, _Lookup] = {}
+_lookups_lock = threading.Lock()
+
+def _check_deliverability(ascii_domain: str, domain: str) -> bool:
+    from email_validator.deliverability import validate_email_deliverability
+    try:
+        info = validate_email_deliverability(ascii_domain, domain, dns_resolver=_resolver())
+    except EmailUndeliverableError:
+        domain_cache.set(ascii_domain, False)
+        return False
+
+    # Timeouts and missing nameservers are reported as "unknown"; let the
+    # address through but don't cache it so the next registration retries.
+    if "unknown-deliverability" in info:
+        return True
+
+    domain_cache.set(ascii_domain, True)
+    return True
+
+def is_domain_deliverable(ascii_domain: str, domain: str) -> bool:
+    """
+    Check whether a domain accepts email, using the per-domain cache.
+
+    Blocks on DNS, so call it off the event loop. Concurrent checks for the
+    same uncached domain share a single lookup.
+    """
+    cached = domain_cache.get(ascii_domain)
+    if cached is not None:
+        return cached
+
+    with _lookups_lock:
+        lookup = _lookups.get(ascii_domain)
+        leader = lookup is None
+        if leader:
+            lookup = _lookups[ascii_domain] = _Lookup()
+
+    if not leader:
+        lookup.done.wait(EMAIL_DNS_TIMEOUT + 1)
+        # A failed or timed-out lookup lets the address through, as "unknown" does
+        return True if lookup.result is None else lookup.result
+
+    try:
+        lookup.result = _check_deliverability(ascii_domain, domain)
+        return lookup.result
+    finally:
+        with _lookups_lock:
+            _lookups.pop(ascii_domain, None)
+        lookup.done.set()
+
+def is_valid_email(email: str, check_deliverability: Optional[bool] = None) -> bool:
+    """
+    Validate an email address.
+
+    Syntax is always checked offline. The DNS deliverability check only runs
+    when requested (or when EMAIL_VALIDATION_MODE is "deliverability").
+    """
+    if check_deliverability is None:
+        check_deliverability = EMAIL_VALIDATION_MODE == "deliverability"
+
+    try:
+        email_info = validate_email(email, check_deliverability=False)
+    except EmailNotValidError:
+        return False
+
+    if not check_deliverability:
+        return True
+
+    return is_domain_deliverable(email_info.ascii_domain, email_info.domain)
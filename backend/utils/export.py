@@ -0,0 +1,69 @@
+import csv
+import io
+import os
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List, Sequence
+from dotenv import load_dotenv
+from utils.fast_json import dumps_bytes
+
+load_dotenv()
+
+# Streaming export configuration
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def ndjson_chunk(columns: Sequence[str], rows: Iterable) -> bytes:
+    """One JSON object per line, with the same keys as the API's attempt responses"""
+    lines = [dumps_bytes(dict(zip(columns, row))) for row in rows]
+    return b"\n".join(lines) + b"\n" if lines else b""
+
+def csv_header(columns: Sequence[str]) -> bytes:
+    return csv_chunk(columns, [columns])
+
+def csv_chunk(columns: Sequence[str], rows: Iterable) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+async def encode_batches(fmt: str, columns: List[str], batches: AsyncIterator) -> AsyncIterator[bytes]:
+    """Serialize batches of rows as they arrive; only one batch is held at a time"""
+    if fmt == "csv":
+        yield csv_header(columns)
+    encode = csv_chunk if fmt == "csv" else ndjson_chunk
+    async for rows in batches:
+        chunk = encode(columns, rows)
+        if chunk:
+            yield chunk
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = EXPORT_GZIP_LEVEL) -> AsyncIterator[bytes]:
+    """Gzip a byte stream on the fly, flushing once per input chunk"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """True if an Accept-Encoding header allows gzip (q=0 opts out)"""
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            q = params.strip()
+            if not q.startswith("q="):
+                return True
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return True
+    return False
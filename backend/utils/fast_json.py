@@ -0,0 +1,47 @@
+import json
+from datetime import date, datetime
+from typing import Any
+from fastapi.responses import JSONResponse
+
+# orjson is several times faster than the stdlib encoder; everything here
+# falls back to json if it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def to_jsonable(value):
+    """`default` hook for encoders: dates and datetimes as ISO 8601 strings"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps_bytes(value: Any, sort_keys: bool = False) -> bytes:
+    """Compact UTF-8 JSON; datetimes become ISO 8601 strings"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+        except TypeError:
+            # e.g. integers wider than 64 bits; the stdlib encoder copes
+            pass
+    return json.dumps(
+        value, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False, default=to_jsonable
+    ).encode("utf-8")
+
+def dumps(value: Any, sort_keys: bool = False) -> str:
+    return dumps_bytes(value, sort_keys).decode("utf-8")
+
+def loads(data):
+    """Parse JSON from str or bytes; raises ValueError on invalid input"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+class FastJSONResponse(JSONResponse):
+    """The app's default response class: JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            try:
+                return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                pass
+        return super().render(content)
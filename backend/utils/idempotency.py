@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from database import IdempotencyKey
+from dotenv import load_dotenv
+
+load_dotenv()
+
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+def validate_key(key: Optional[str]) -> Optional[str]:
+    """Normalise an Idempotency-Key header value; None when the client didn't send one"""
+    if key is None:
+        return None
+    key = key.strip()
+    if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1-{IDEMPOTENCY_KEY_MAX_LENGTH} characters"
+        )
+    return key
+
+def request_fingerprint(payload: dict) -> str:
+    """Hash a request body so a reused key with a different body can be rejected"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def _now() -> datetime:
+    # Stored naive, like the other DateTime columns read back from SQLite
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def find_replay(db: Session, user_id: int, endpoint: str, key: str, fingerprint: str) -> Optional[int]:
+    """
+    Return the quiz attempt id recorded for this key, or None if it is new or expired.
+
+    Raises 422 if the key was already used for a different request body.
+    """
+    record = db.scalars(select(IdempotencyKey).where(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.endpoint == endpoint,
+        IdempotencyKey.key == key
+    )).first()
+    if record is None or record.expires_at <= _now():
+        return None
+    if record.request_hash != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request"
+        )
+    return record.quiz_attempt_id
+
+def record_key(db: Session, user_id: int, endpoint: str, key: str, fingerprint: str, quiz_attempt_id: int):
+    """Store a key in the caller's transaction, so it commits (or not) with the write it guards"""
+    # An expired record would still trip the unique index
+    db.execute(delete(IdempotencyKey).where(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.endpoint == endpoint,
+        IdempotencyKey.key == key,
+        IdempotencyKey.expires_at <= _now()
+    ))
+    db.add(IdempotencyKey(
+        user_id=user_id,
+        endpoint=endpoint,
+        key=key,
+        request_hash=fingerprint,
+        quiz_attempt_id=quiz_attempt_id,
+        expires_at=_now() + timedelta(seconds=IDEMPOTENCY_KEY_TTL_SECONDS)
+    ))
+    db.flush()
+
+def purge_expired(db: Session) -> int:
+    """Delete expired keys; returns how many were removed"""
+    result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= _now()))
+    return result.rowcount
@@ -0,0 +1,182 @@
+import os
+import time
+import zlib
+from typing import Optional, Union
+from sqlalchemy import LargeBinary, MetaData, Table, Text, and_, bindparam, select, update
+from sqlalchemy.dialects.mysql import LONGBLOB
+from sqlalchemy.engine import Engine
+from sqlalchemy.types import TypeDecorator
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# JSON column compression configuration
+# "zlib" (default), "zstd" (needs the optional zstandard package) or "none"
+JSON_COMPRESSION = os.getenv("JSON_COMPRESSION", "zlib").lower()
+JSON_COMPRESSION_LEVEL = int(os.getenv("JSON_COMPRESSION_LEVEL", "6"))
+# Values shorter than this are stored uncompressed (still with the header)
+JSON_COMPRESSION_MIN_BYTES = int(os.getenv("JSON_COMPRESSION_MIN_BYTES", "256"))
+
+# Encoded values start with MAGIC, a format version byte and a codec byte.
+# 0xFF never appears in UTF-8 text, so legacy plain-JSON rows can't be
+# mistaken for encoded ones.
+MAGIC = b"\xffQJ"
+FORMAT_VERSION = 1
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+HEADER_SIZE = len(MAGIC) + 2
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+def _default_codec() -> int:
+    if JSON_COMPRESSION == "none":
+        return CODEC_RAW
+    if JSON_COMPRESSION == "zstd":
+        if _zstd() is not None:
+            return CODEC_ZSTD
+        print("⚠️  JSON_COMPRESSION=zstd but the zstandard package is not installed; using zlib")
+    return CODEC_ZLIB
+
+DEFAULT_CODEC = _default_codec()
+
+def is_encoded(raw: Union[bytes, str, None]) -> bool:
+    return isinstance(raw, (bytes, bytearray, memoryview)) and bytes(raw[:len(MAGIC)]) == MAGIC
+
+def encode_json(value: str, codec: Optional[int] = None) -> bytes:
+    """Encode a JSON string as header + (possibly compressed) UTF-8 payload"""
+    payload = value.encode("utf-8")
+    codec = DEFAULT_CODEC if codec is None else codec
+    if len(payload) < JSON_COMPRESSION_MIN_BYTES:
+        codec = CODEC_RAW
+
+    if codec == CODEC_ZLIB:
+        payload = zlib.compress(payload, JSON_COMPRESSION_LEVEL)
+    elif codec == CODEC_ZSTD:
+        payload = _zstd().ZstdCompressor(level=JSON_COMPRESSION_LEVEL).compress(payload)
+    return MAGIC + bytes((FORMAT_VERSION, codec)) + payload
+
+def decode_json(raw: Union[bytes, str, None]) -> Optional[str]:
+    """Decode a stored value back to its JSON string; plain-JSON legacy rows pass through"""
+    if raw is None or isinstance(raw, str):
+        return raw
+    raw = bytes(raw)
+    if not raw.startswith(MAGIC):
+        return raw.decode("utf-8")
+
+    version, codec = raw[len(MAGIC)], raw[len(MAGIC) + 1]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported JSON column format version: {version}")
+    payload = raw[HEADER_SIZE:]
+    if codec == CODEC_ZLIB:
+        payload = zlib.decompress(payload)
+    elif codec == CODEC_ZSTD:
+        zstandard = _zstd()
+        if zstandard is None:
+            raise RuntimeError("Value is zstd-compressed but the zstandard package is not installed")
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif codec != CODEC_RAW:
+        raise ValueError(f"Unknown JSON column codec: {codec}")
+    return payload.decode("utf-8")
+
+class CompressedJSONText(TypeDecorator):
+    """
+    A JSON string column stored compressed.
+
+    Python code keeps reading and writing JSON strings; values are encoded on
+    the way in and decoded on the way out, and rows written before
+    compression (plain JSON text) are read as-is.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            # SQLite stores blobs in TEXT columns as-is; keeping TEXT means
+            # legacy rows come back as str instead of failing bytes coercion
+            return dialect.type_descriptor(Text())
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(LONGBLOB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or is_encoded(value):
+            return value
+        return encode_json(value)
+
+    def process_result_value(self, value, dialect):
+        return decode_json(value)
+
+# Background conversion of legacy plain-JSON rows
+
+COMPRESSED_COLUMNS = {
+    "quiz_attempts": ("questions_data", "answers"),
+    "question_sets": ("questions_data",),
+}
+
+def convert_table(
+    engine: Engine,
+    table_name: str,
+    columns,
+    batch_size: int = 500,
+    pause: float = 0.0,
+    dry_run: bool = False,
+    verbose: bool = True
+) -> dict:
+    """
+    Rewrite plain-JSON values in `columns` to the compressed format.
+
+    Walks the table by primary key in small committed batches, sleeping
+    `pause` seconds between them so it can run next to the live app. Each
+    update only applies if the value is unchanged since it was read.
+    """
+    table = Table(table_name, MetaData(), autoload_with=engine)
+    stats = {"rows": 0, "converted": 0, "bytes_before": 0, "bytes_after": 0}
+    last_id = 0
+
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(table.c.id, *[table.c[c] for c in columns])
+                .where(table.c.id > last_id)
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            stats["rows"] += len(rows)
+
+            for column in columns:
+                changes = []
+                for row in rows:
+                    raw = getattr(row, column)
+                    if raw is None or is_encoded(raw):
+                        continue
+                    text_value = decode_json(raw)
+                    encoded = encode_json(text_value)
+                    stats["bytes_before"] += len(text_value.encode("utf-8"))
+                    stats["bytes_after"] += len(encoded)
+                    changes.append({"row_id": row.id, "old": raw, "new": encoded})
+
+                if changes and not dry_run:
+                    conn.execute(
+                        update(table)
+                        .where(and_(table.c.id == bindparam("row_id"), table.c[column] == bindparam("old")))
+                        .values({column: bindparam("new")}),
+                        changes
+                    )
+                stats["converted"] += len(changes)
+
+        if verbose:
+            print(f"   ↳ {table_name}: scanned {stats['rows']}, converted {stats['converted']} values")
+        if pause:
+            time.sleep(pause)
+
+    return stats
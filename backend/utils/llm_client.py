@@ -1,8 +1,9 @@
-import requests
 import json
 import os
+import time
 from typing import Dict, Any
 from dotenv import load_dotenv
+from utils.metrics import LLM_DURATION
 
 # Load environment variables from .env file
 load_dotenv()
@@ -15,7 +16,9 @@ class GeminiClient:
         self.base_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
     
     def generate_content(self, prompt: str) -> str:
-    
+        # Imported here: requests (and certifi) are only needed once questions are generated
+        import requests
+
         payload = json.dumps({
             "contents": [
                 {
@@ -33,6 +36,8 @@ class GeminiClient:
             "Content-Type": "application/json"
         }
 
+        start = time.perf_counter()
+        outcome = "error"
         try:
             response = requests.post(self.base_url, headers=headers, data=payload)
             response.raise_for_status()
@@ -40,11 +45,20 @@ class GeminiClient:
             result = response.json()
 
             # Gemini response format fix
-            return result["candidates"][0]["content"]["parts"][0]["text"]
+            text = result["candidates"][0]["content"]["parts"][0]["text"]
+            outcome = "ok"
+            return text
+        except requests.exceptions.HTTPError as e:
+            outcome = "http_error"
+            raise Exception(f"API request failed: {str(e)}")
         except requests.exceptions.RequestException as e:
+            outcome = "request_error"
             raise Exception(f"API request failed: {str(e)}")
         except (KeyError, IndexError) as e:
+            outcome = "bad_response"
             raise Exception(f"Unexpected API response format: {str(e)}")
+        finally:
+            LLM_DURATION.observe(time.perf_counter() - start, (outcome,))
 
 
     def generate_questions(self, topic: str, number_questions: int) -> str:
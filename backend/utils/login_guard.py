@@ -0,0 +1,140 @@
+import os
+import time
+from collections import deque
+from typing import Deque, Dict
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Login admission configuration
+LOGIN_WINDOW_SECONDS = int(os.getenv("LOGIN_WINDOW_SECONDS", "60"))
+LOGIN_MAX_ATTEMPTS_PER_USERNAME = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_USERNAME", "10"))
+LOGIN_MAX_ATTEMPTS_PER_IP = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_IP", "30"))
+LOGIN_MAX_CONCURRENT_VERIFICATIONS = int(
+    os.getenv("LOGIN_MAX_CONCURRENT_VERIFICATIONS", str(os.cpu_count() or 1))
+)
+LOGIN_MAX_TRACKED_KEYS = int(os.getenv("LOGIN_MAX_TRACKED_KEYS", "100000"))
+
+class SlidingWindowCounter:
+    """
+    Counts events per key over the last `window` seconds.
+
+    Only touched from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, limit: int, window: int, max_keys: int = LOGIN_MAX_TRACKED_KEYS):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._events: Dict[str, Deque[float]] = {}
+
+    def _prune(self, events: Deque[float], now: float):
+        cutoff = now - self.window
+        while events and events[0] <= cutoff:
+            events.popleft()
+
+    def retry_after(self, key: str) -> int:
+        """Seconds until `key` is allowed again, or 0 if it is under the limit"""
+        events = self._events.get(key)
+        if not events:
+            return 0
+        now = time.monotonic()
+        self._prune(events, now)
+        if len(events) < self.limit:
+            return 0
+        return max(1, int(events[0] + self.window - now) + 1)
+
+    def hit(self, key: str):
+        now = time.monotonic()
+        events = self._events.get(key)
+        if events is None:
+            if len(self._events) >= self.max_keys:
+                self._evict(now)
+            events = self._events[key] = deque()
+        self._prune(events, now)
+        events.append(now)
+
+    def _evict(self, now: float):
+        """Drop keys with no events left in the window; fall back to the oldest keys"""
+        for key in list(self._events):
+            self._prune(self._events[key], now)
+            if not self._events[key]:
+                del self._events[key]
+        while len(self._events) >= self.max_keys:
+            self._events.pop(next(iter(self._events)))
+
+    def __len__(self):
+        return len(self._events)
+
+class LoginAdmission:
+    """Admission control in front of password verification"""
+
+    def __init__(self):
+        self.by_username = SlidingWindowCounter(LOGIN_MAX_ATTEMPTS_PER_USERNAME, LOGIN_WINDOW_SECONDS)
+        self.by_ip = SlidingWindowCounter(LOGIN_MAX_ATTEMPTS_PER_IP, LOGIN_WINDOW_SECONDS)
+        self.max_concurrent = LOGIN_MAX_CONCURRENT_VERIFICATIONS
+        self.in_flight = 0
+        self.counters = {
+            "admitted": 0,
+            "rejected_username": 0,
+            "rejected_ip": 0,
+            "rejected_busy": 0,
+        }
+
+    def admit(self, username: str, client_ip: str):
+        """Record a login attempt, raising 429 before any hashing if a limit is exceeded"""
+        retry_after = self.by_ip.retry_after(client_ip)
+        if retry_after:
+            self.counters["rejected_ip"] += 1
+            raise self._too_many(retry_after)
+
+        retry_after = self.by_username.retry_after(username)
+        if retry_after:
+            self.counters["rejected_username"] += 1
+            raise self._too_many(retry_after)
+
+        self._check_capacity()
+        self.by_ip.hit(client_ip)
+        self.by_username.hit(username)
+        self.counters["admitted"] += 1
+
+    async def verify(self, func, *args):
+        """Run a blocking hash verification in the threadpool, under the global concurrency cap"""
+        self._check_capacity()
+        self.in_flight += 1
+        try:
+            return await run_in_threadpool(func, *args)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "in_flight_verifications": self.in_flight,
+            "max_concurrent_verifications": self.max_concurrent,
+            "tracked_usernames": len(self.by_username),
+            "tracked_ips": len(self.by_ip),
+            "window_seconds": LOGIN_WINDOW_SECONDS,
+            "max_attempts_per_username": self.by_username.limit,
+            "max_attempts_per_ip": self.by_ip.limit,
+        }
+
+    def _check_capacity(self):
+        if self.in_flight >= self.max_concurrent:
+            self.counters["rejected_busy"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+    def _too_many(self, retry_after: int) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+login_admission = LoginAdmission()
@@ -0,0 +1,262 @@
+from datetime import datetime, timezone
+from typing import Optional, Set
+from sqlalchemy import and_, delete, exists, func, or_, select, text, update
+from sqlalchemy.orm import Session, aliased
+from database import IdempotencyKey, QuestionSet, QuizAttempt
+from utils.fast_json import loads
+from utils.question_sets import get_or_create_question_set_id
+from utils.quiz_stats import rebuild_user_stats
+from quiz_models import QuizStatus
+
+DEFAULT_BATCH_SIZE = 1000
+
+COMPLETED = QuizStatus.COMPLETED.value
+INCOMPLETE = QuizStatus.INCOMPLETE.value
+
+def _report(label: str, done: int, dry_run: bool):
+    verb = "would process" if dry_run else "processed"
+    print(f"   ↳ {label}: {verb} {done}")
+
+def _delete_attempts(db: Session, ids):
+    # Idempotency keys point at attempts, so they go first
+    db.execute(delete(IdempotencyKey).where(IdempotencyKey.quiz_attempt_id.in_(ids)))
+    db.execute(delete(QuizAttempt).where(QuizAttempt.id.in_(ids)))
+
+def _delete_in_batches(
+    db: Session,
+    candidates,
+    label: str,
+    batch_size: int,
+    dry_run: bool,
+    affected_users: Set[int],
+    verbose: bool
+) -> int:
+    """
+    Delete the attempts matched by `candidates` (a select of id, user_id).
+
+    Candidates are found a batch at a time, walking forward by id, and each
+    batch is deleted and committed on its own so no lock is held for long.
+    """
+    total = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            candidates.where(QuizAttempt.id > last_id).order_by(QuizAttempt.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        affected_users.update(row.user_id for row in rows)
+        if not dry_run:
+            _delete_attempts(db, [row.id for row in rows])
+            db.commit()
+        total += len(rows)
+        if verbose:
+            _report(label, total, dry_run)
+    return total
+
+def rebuild_stats_for(db: Session, user_ids, batch_size: int = DEFAULT_BATCH_SIZE, verbose: bool = True) -> int:
+    """Recompute the stats rows of the given users, committing per batch"""
+    user_ids = sorted(user_ids)
+    for start in range(0, len(user_ids), batch_size):
+        for user_id in user_ids[start:start + batch_size]:
+            rebuild_user_stats(db, user_id)
+        db.commit()
+    if verbose and user_ids:
+        print(f"   ↳ rebuilt stats for {len(user_ids)} users")
+    return len(user_ids)
+
+def dedupe(db: Session, batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False, verbose: bool = True) -> dict:
+    """
+    Remove duplicate quiz attempts left by clients that re-posted quizzes.
+
+    1. Incomplete attempts superseded by a completed attempt for the same
+       user and topic created at the same time or later.
+    2. Older incomplete attempts when a newer incomplete one exists for the
+       same user and topic (the most recent is kept).
+    """
+    other = aliased(QuizAttempt)
+    affected_users = set()
+
+    has_completed_copy = exists().where(
+        other.user_id == QuizAttempt.user_id,
+        other.topic == QuizAttempt.topic,
+        other.status == COMPLETED,
+        other.created_at >= QuizAttempt.created_at
+    )
+    has_newer_incomplete = exists().where(
+        other.user_id == QuizAttempt.user_id,
+        other.topic == QuizAttempt.topic,
+        other.status == INCOMPLETE,
+        or_(
+            other.created_at > QuizAttempt.created_at,
+            and_(other.created_at == QuizAttempt.created_at, other.id > QuizAttempt.id)
+        )
+    )
+    superseded = select(QuizAttempt.id, QuizAttempt.user_id).where(
+        QuizAttempt.status == INCOMPLETE, has_completed_copy
+    )
+    # Rows the first pass removes are excluded so dry-run counts match a real run
+    older_incomplete = select(QuizAttempt.id, QuizAttempt.user_id).where(
+        QuizAttempt.status == INCOMPLETE, has_newer_incomplete, ~has_completed_copy
+    )
+
+    result = {
+        "superseded_incomplete": _delete_in_batches(
+            db, superseded, "incomplete attempts with a completed copy", batch_size, dry_run, affected_users, verbose
+        ),
+        "duplicate_incomplete": _delete_in_batches(
+            db, older_incomplete, "older duplicate incomplete attempts", batch_size, dry_run, affected_users, verbose
+        ),
+    }
+    result["stats_rebuilt"] = 0 if dry_run else rebuild_stats_for(db, affected_users, batch_size, verbose)
+    return result
+
+def _questions_missing(raw: Optional[str]) -> bool:
+    return not raw or raw in ("undefined", "null")
+
+def _questions_malformed(raw: str) -> bool:
+    try:
+        loads(raw)
+        return False
+    except ValueError:
+        return True
+
+def _placeholder_questions(topic: str) -> list:
+    return [{
+        "question": f"Sample question for {topic}",
+        "options": ["A) Option 1", "B) Option 2", "C) Option 3", "D) Option 4"]
+    }]
+
+def repair(db: Session, batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False, verbose: bool = True) -> dict:
+    """
+    Fix attempts whose questions are missing or not valid JSON.
+
+    Incomplete attempts with no questions can't be resumed and are deleted;
+    everything else broken keeps its row and gets placeholder questions.
+    Only attempts still storing questions inline are checked: shared
+    question sets are written from parsed JSON and are always valid.
+    """
+    result = {"checked": 0, "deleted": 0, "fixed": 0, "stats_rebuilt": 0}
+    affected_users = set()
+    last_id = 0
+    while True:
+        # Stream a window of rows at a time; no transaction spans batches
+        rows = db.execute(
+            select(QuizAttempt.id, QuizAttempt.user_id, QuizAttempt.topic, QuizAttempt.status, QuizAttempt.questions_json)
+            .where(QuizAttempt.id > last_id, QuizAttempt.question_set_id.is_(None))
+            .order_by(QuizAttempt.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        result["checked"] += len(rows)
+
+        missing = [row for row in rows if _questions_missing(row.questions_json)]
+        to_delete = [row.id for row in missing if row.status == INCOMPLETE]
+        to_fix = [row for row in missing if row.status != INCOMPLETE]
+        to_fix += [
+            row for row in rows
+            if not _questions_missing(row.questions_json) and _questions_malformed(row.questions_json)
+        ]
+        affected_users.update(row.user_id for row in missing if row.status == INCOMPLETE)
+
+        if not dry_run:
+            if to_delete:
+                _delete_attempts(db, to_delete)
+            by_topic = {}
+            for row in to_fix:
+                by_topic.setdefault(row.topic, []).append(row.id)
+            for topic, ids in by_topic.items():
+                set_id = get_or_create_question_set_id(db, _placeholder_questions(topic))
+                db.execute(
+                    update(QuizAttempt)
+                    .where(QuizAttempt.id.in_(ids))
+                    .values(question_set_id=set_id, questions_json=None)
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+        result["deleted"] += len(to_delete)
+        result["fixed"] += len(to_fix)
+        if verbose:
+            print(f"   ↳ checked {result['checked']}, {'would delete' if dry_run else 'deleted'} {result['deleted']}, "
+                  f"{'would fix' if dry_run else 'fixed'} {result['fixed']}")
+
+    if not dry_run:
+        result["stats_rebuilt"] = rebuild_stats_for(db, affected_users, batch_size, verbose)
+    return result
+
+def _purge_in_batches(db: Session, model, candidates, label: str, batch_size: int, dry_run: bool, verbose: bool) -> int:
+    """Delete rows of `model` whose ids `candidates` selects, one committed batch at a time"""
+    total = 0
+    last_id = 0
+    while True:
+        ids = list(db.scalars(candidates.where(model.id > last_id).order_by(model.id).limit(batch_size)))
+        if not ids:
+            break
+        last_id = ids[-1]
+        if not dry_run:
+            db.execute(delete(model).where(model.id.in_(ids)))
+            db.commit()
+        total += len(ids)
+        if verbose:
+            _report(label, total, dry_run)
+    return total
+
+def vacuum(
+    db: Session,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False,
+    compact: bool = False,
+    orphans: bool = False,
+    verbose: bool = True
+) -> dict:
+    """
+    Purge expired idempotency keys, then refresh planner statistics.
+
+    With `orphans`, also delete question sets no attempt references. Only
+    do that with the API stopped: running servers cache question set ids
+    and would keep linking new attempts to the deleted rows. With
+    `compact`, also reclaim free space (VACUUM on SQLite, OPTIMIZE TABLE on
+    MySQL), which locks the tables while it runs.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    result = {
+        "expired_keys": _purge_in_batches(
+            db, IdempotencyKey,
+            select(IdempotencyKey.id).where(IdempotencyKey.expires_at <= now),
+            "expired idempotency keys", batch_size, dry_run, verbose
+        ),
+        "orphan_question_sets": _purge_in_batches(
+            db, QuestionSet,
+            select(QuestionSet.id).where(~exists().where(QuizAttempt.question_set_id == QuestionSet.id)),
+            "unreferenced question sets", batch_size, dry_run, verbose
+        ) if orphans else 0,
+        "analyzed": False,
+        "compacted": False,
+    }
+    if dry_run:
+        return result
+
+    bind = db.get_bind()
+    tables = ("quiz_attempts", "question_sets", "idempotency_keys", "user_quiz_stats")
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if bind.dialect.name == "sqlite":
+            if compact:
+                conn.execute(text("VACUUM"))
+            conn.execute(text("ANALYZE"))
+        elif bind.dialect.name == "mysql":
+            if compact:
+                conn.execute(text(f"OPTIMIZE TABLE {', '.join(tables)}"))
+            conn.execute(text(f"ANALYZE TABLE {', '.join(tables)}"))
+    result["analyzed"] = True
+    result["compacted"] = compact
+    return result
+
+def table_counts(db: Session) -> dict:
+    """Attempt counts by status, for before/after reporting"""
+    rows = db.execute(select(QuizAttempt.status, func.count()).group_by(QuizAttempt.status)).all()
+    counts = {status: count for status, count in rows}
+    counts["total"] = sum(counts.values())
+    return counts
@@ -0,0 +1,275 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+from sqlalchemy import event
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Metrics configuration
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+LLM_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+Labels = Tuple[str, ...]
+
+class _Metric:
+    """
+    Base for metrics whose values are sharded per thread.
+
+    Each thread only ever writes its own dict, so recording takes no lock;
+    the lock is only taken the first time a thread records anything.
+    Scrapes merge the shards, copying each with list(), which runs without
+    releasing the GIL.
+    """
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._shards: List[dict] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = {}
+            with self._lock:
+                self._shards.append(values)
+            self._local.values = values
+            return values
+
+    def _snapshots(self):
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            yield list(shard.items())
+
+    def samples(self) -> Iterable[Tuple[str, Labels, float]]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    """Monotonic count per label set"""
+
+    type = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        values = self._shard()
+        values[labels] = values.get(labels, 0) + amount
+
+    def samples(self):
+        totals: Dict[Labels, float] = {}
+        for items in self._snapshots():
+            for labels, value in items:
+                totals[labels] = totals.get(labels, 0) + value
+        for labels, value in totals.items():
+            yield self.name, labels, value
+
+class Gauge(Counter):
+    """Value that goes up and down, such as requests in flight"""
+
+    type = "gauge"
+
+    def add(self, labels: Labels, amount: float):
+        self.inc(labels, amount)
+
+class Histogram(_Metric):
+    """Observations counted into fixed buckets, plus their sum"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels = (), buckets=REQUEST_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value: float, labels: Labels = ()):
+        values = self._shard()
+        counts = values.get(labels)
+        if counts is None:
+            # One slot per bucket, one for +Inf, then the running sum
+            counts = values[labels] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self):
+        merged: Dict[Labels, list] = {}
+        for items in self._snapshots():
+            for labels, counts in items:
+                counts = list(counts)
+                total = merged.setdefault(labels, [0] * len(counts))
+                for i, count in enumerate(counts):
+                    total[i] += count
+        for labels, counts in merged.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield self.name + "_bucket", labels + (_format_value(bound),), cumulative
+            yield self.name + "_sum", labels, counts[-1]
+            yield self.name + "_count", labels, cumulative
+
+REGISTRY: List[_Metric] = []
+# Callables returning (name, help, type, labelnames, samples) for values read at scrape time
+COLLECTORS: List[Callable[[], Iterable[tuple]]] = []
+
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being handled", ("method", "route"))
+HTTP_DURATION = Histogram(
+    "http_request_duration_seconds", "Time spent in the route handler", ("method", "route", "status")
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time", ("engine", "operation"), DB_BUCKETS
+)
+DB_QUERY_ERRORS = Counter("db_query_errors_total", "SQL statements that raised", ("engine", "operation"))
+DB_POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to get a connection from the pool, including waiting and opening new connections",
+    ("engine",), DB_BUCKETS
+)
+LLM_DURATION = Histogram(
+    "llm_request_duration_seconds", "Gemini API call latency", ("outcome",), LLM_BUCKETS
+)
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labelnames: Labels, labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labels)) + "}"
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    families = [
+        (m.name, m.documentation, m.type, m.labelnames + (("le",) if m.type == "histogram" else ()), m.samples())
+        for m in REGISTRY
+    ]
+    for collector in COLLECTORS:
+        families.extend(collector())
+    for name, documentation, metric_type, labelnames, samples in families:
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for sample_name, labels, value in samples:
+            # _sum and _count carry the labels without "le"
+            lines.append(f"{sample_name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+# -- HTTP routes ------------------------------------------------------------
+
+class _RouteMetrics:
+    """Wraps one route's ASGI app, so the route template is known without re-matching the path"""
+
+    def __init__(self, app, route: str):
+        self.app = app
+        self.route = route
+
+    async def __call__(self, scope, receive, send):
+        labels = (scope["method"], self.route)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.add(labels, 1)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception as exc:
+            # HTTPExceptions are turned into responses further out
+            status = getattr(exc, "status_code", 500)
+            raise
+        finally:
+            HTTP_IN_FLIGHT.add(labels, -1)
+            HTTP_DURATION.observe(time.perf_counter() - start, labels + (str(status),))
+
+def instrument_routes(app):
+    """Record latency and in-flight counts for every HTTP route of `app`; call after adding routes"""
+    if not METRICS_ENABLED:
+        return
+    for route in app.router.routes:
+        if getattr(route, "methods", None) and not isinstance(route.app, _RouteMetrics):
+            route.app = _RouteMetrics(route.app, route.path)
+
+# -- Database ---------------------------------------------------------------
+
+_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+_instrumented_pools = []
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip()[:6].upper()
+    return keyword if keyword in _OPERATIONS else "OTHER"
+
+def _time_pool_checkout(pool, name: str):
+    # SQLAlchemy has no "checkout started" event, so time the pool's own getter
+    do_get = pool._do_get
+    labels = (name,)
+
+    def timed_do_get():
+        start = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            DB_POOL_CHECKOUT.observe(time.perf_counter() - start, labels)
+
+    pool._do_get = timed_do_get
+
+def instrument_engine(engine, name: str):
+    """Record statement timings, errors and pool checkout waits for a sync or async engine"""
+    if not METRICS_ENABLED:
+        return
+    sync_engine = engine.sync_engine if hasattr(engine, "sync_engine") else engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["metrics_query_start"].pop()
+        DB_QUERY_DURATION.observe(time.perf_counter() - start, (name, _operation(statement)))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        starts = context.connection.info.get("metrics_query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        DB_QUERY_ERRORS.inc((name, _operation(context.statement or "")))
+
+    @event.listens_for(sync_engine, "engine_disposed")
+    def engine_disposed(disposed_engine):
+        # dispose() swaps in a fresh pool
+        _time_pool_checkout(disposed_engine.pool, name)
+
+    _time_pool_checkout(sync_engine.pool, name)
+    _instrumented_pools.append((name, sync_engine))
+
+def _pool_collector():
+    samples = []
+    for name, sync_engine in _instrumented_pools:
+        pool = sync_engine.pool
+        # NullPool and friends keep no connections to report
+        if not hasattr(pool, "checkedout"):
+            continue
+        samples.append(("db_pool_connections", (name, "checked_out"), pool.checkedout()))
+        samples.append(("db_pool_connections", (name, "idle"), pool.checkedin()))
+        # QueuePool counts overflow from -pool_size
+        samples.append(("db_pool_connections", (name, "overflow"), max(pool.overflow(), 0)))
+    yield ("db_pool_connections", "Connections in the pool by state", "gauge", ("engine", "state"), samples)
+
+COLLECTORS.append(_pool_collector)
@@ -0,0 +1,195 @@
+import importlib
+import os
+import pkgutil
+import re
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Apply pending migrations when the API starts; when off, startup refuses to
+# run against a schema that is behind
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "true").lower() in ("1", "true", "yes")
+# Retries when another worker is migrating the same database at the same time
+STARTUP_MIGRATION_ATTEMPTS = 3
+
+MIGRATIONS_PACKAGE = "migrations"
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), MIGRATIONS_PACKAGE)
+
+# Bookkeeping table recording which versions have been applied
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _meta,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+class Migration:
+    """A numbered module in migrations/ exposing upgrade(conn)"""
+
+    def __init__(self, version: int, name: str, module):
+        self.version = version
+        self.name = name
+        self.module = module
+
+    @property
+    def description(self) -> str:
+        return (self.module.__doc__ or self.name).strip().splitlines()[0]
+
+    def upgrade(self, conn: Connection):
+        self.module.upgrade(conn)
+
+def discover_migrations() -> List[Migration]:
+    """Find migrations/NNNN_name.py modules, ordered by version"""
+    migrations = []
+    for info in pkgutil.iter_modules([MIGRATIONS_DIR]):
+        match = re.match(r"^(\d{4})_(\w+)$", info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{MIGRATIONS_PACKAGE}.{info.name}")
+        migrations.append(Migration(int(match.group(1)), match.group(2), module))
+    return sorted(migrations, key=lambda m: m.version)
+
+def applied_versions(engine: Engine) -> set:
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        return set(conn.scalars(select(schema_migrations.c.version)))
+
+def pending_migrations(engine: Engine) -> List[Migration]:
+    applied = applied_versions(engine)
+    return [m for m in discover_migrations() if m.version not in applied]
+
+def run_migrations(engine: Engine, target: Optional[int] = None, verbose: bool = True) -> List[Migration]:
+    """
+    Apply pending migrations up to `target` (or all), each in its own transaction.
+
+    A migration may call conn.commit() itself to work through large tables in
+    batches. MySQL commits DDL implicitly, so migrations should be written to
+    be safe to re-run (see create_index_if_missing).
+    """
+    ran = []
+    for migration in pending_migrations(engine):
+        if target is not None and migration.version > target:
+            break
+        if verbose:
+            print(f"⏫ Applying {migration.version:04d}_{migration.name}: {migration.description}")
+        with engine.connect() as conn:
+            migration.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=migration.version,
+                name=migration.name,
+                applied_at=datetime.now(timezone.utc)
+            ))
+            conn.commit()
+        ran.append(migration)
+    return ran
+
+def migrate_on_startup(engine: Engine, auto_migrate: bool = AUTO_MIGRATE):
+    """
+    Bring the schema up to date before serving, or fail with instructions.
+
+    create_tables only adds missing tables, so a database created before a
+    migration would start cleanly and then fail on its first query.
+    """
+    if auto_migrate:
+        for _ in range(STARTUP_MIGRATION_ATTEMPTS):
+            try:
+                ran = run_migrations(engine)
+                if ran:
+                    print(f"✅ Applied {len(ran)} pending migration(s)")
+                break
+            except IntegrityError:
+                # Another worker recorded the same version first; the
+                # migrations are safe to re-run, so pick up what's left
+                continue
+
+    pending = pending_migrations(engine)
+    if pending:
+        names = ", ".join(f"{m.version:04d}_{m.name}" for m in pending)
+        raise RuntimeError(
+            f"Database schema is behind ({len(pending)} pending migration(s): {names}). "
+            "Run `python migrate_db.py` before starting the API."
+        )
+
+# Helpers for writing migrations
+
+def create_index_if_missing(conn: Connection, table_name: str, index_name: str, columns: List[str], unique: bool = False):
+    """Create an index unless one with the same name already exists"""
+    existing = {index["name"] for index in inspect(conn).get_indexes(table_name)}
+    if index_name in existing:
+        return False
+    table = Table(table_name, MetaData(), autoload_with=conn)
+    Index(index_name, *[table.c[c] for c in columns], unique=unique).create(conn)
+    return True
+
+def add_column_if_missing(conn: Connection, table_name: str, column: Column):
+    """Add a nullable column unless it already exists"""
+    existing = {c["name"] for c in inspect(conn).get_columns(table_name)}
+    if column.name in existing:
+        return False
+    preparer = conn.dialect.identifier_preparer
+    column_type = column.type.compile(dialect=conn.dialect)
+    conn.execute(text(
+        f"ALTER TABLE {preparer.quote(table_name)} ADD COLUMN {preparer.quote(column.name)} {column_type} NULL"
+    ))
+    for fk in column.foreign_keys:
+        if conn.dialect.name == "sqlite":
+            # SQLite can't add constraints to an existing table; the model
+            # still declares the relationship for fresh databases
+            continue
+        target_table, target_column = fk.target_fullname.split(".")
+        conn.execute(text(
+            f"ALTER TABLE {preparer.quote(table_name)} ADD CONSTRAINT "
+            f"{preparer.quote(f'fk_{table_name}_{column.name}')} FOREIGN KEY ({preparer.quote(column.name)}) "
+            f"REFERENCES {preparer.quote(target_table)} ({preparer.quote(target_column)})"
+        ))
+    return True
+
+def make_column_nullable(conn: Connection, table_name: str, column_name: str):
+    """Drop the NOT NULL constraint from a column, if it has one"""
+    columns = {c["name"]: c for c in inspect(conn).get_columns(table_name)}
+    if columns[column_name]["nullable"]:
+        return False
+
+    preparer = conn.dialect.identifier_preparer
+    if conn.dialect.name != "sqlite":
+        column_type = columns[column_name]["type"].compile(dialect=conn.dialect)
+        conn.execute(text(
+            f"ALTER TABLE {preparer.quote(table_name)} MODIFY {preparer.quote(column_name)} {column_type} NULL"
+        ))
+        return True
+
+    # SQLite can't alter a column in place: copy into a rebuilt table, then
+    # swap it in and recreate the indexes (dropped along with the old table)
+    meta = MetaData()
+    old = Table(table_name, meta, autoload_with=conn)
+    indexes = [(index.name, [c.name for c in index.columns], index.unique) for index in old.indexes]
+    new = Table(
+        f"{table_name}_rebuild",
+        meta,
+        *[
+            Column(
+                c.name,
+                c.type,
+                *[ForeignKey(fk.target_fullname) for fk in c.foreign_keys],
+                primary_key=c.primary_key,
+                nullable=True if c.name == column_name else c.nullable,
+                server_default=c.server_default,
+            )
+            for c in old.columns
+        ]
+    )
+    new.create(conn)
+    names = [c.name for c in old.columns]
+    conn.execute(new.insert().from_select(names, select(*[old.c[n] for n in names])))
+    old.drop(conn)
+    conn.execute(text(f"ALTER TABLE {preparer.quote(new.name)} RENAME TO {preparer.quote(table_name)}"))
+    for index_name, index_columns, unique in indexes:
+        create_index_if_missing(conn, table_name, index_name, index_columns, unique)
+    return True
@@ -0,0 +1,82 @@
+from contextvars import ContextVar
+from typing import Any, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from utils.fast_json import FastJSONResponse, dumps_bytes, to_jsonable
+
+# MessagePack is optional; without it every client gets JSON
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+_wants_msgpack: ContextVar[bool] = ContextVar("wants_msgpack", default=False)
+
+def _accept_quality(accept: str, media_types) -> float:
+    """Highest q the Accept header gives any of `media_types` (exact matches only)"""
+    best = 0.0
+    for part in accept.split(","):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        if media_type.lower() not in media_types:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    pass
+        best = max(best, q)
+    return best
+
+def prefers_msgpack(accept: str) -> bool:
+    """True if the client asks for MessagePack over JSON; ties and wildcards go to JSON"""
+    if msgpack is None or not accept:
+        return False
+    return _accept_quality(accept, MSGPACK_MEDIA_TYPES) > _accept_quality(accept, (JSON_MEDIA_TYPE,))
+
+def wants_msgpack() -> bool:
+    """Whether the current request negotiated MessagePack"""
+    return _wants_msgpack.get()
+
+def encode_body(content: Any) -> Tuple[bytes, str]:
+    """Encode plain data for the current request: (body, media type)"""
+    if wants_msgpack():
+        return msgpack.packb(content, default=to_jsonable), MSGPACK_MEDIA_TYPE
+    return dumps_bytes(content), JSON_MEDIA_TYPE
+
+class NegotiatedResponse(FastJSONResponse):
+    """The app's default response class: MessagePack when negotiated, orjson JSON otherwise"""
+
+    def render(self, content: Any) -> bytes:
+        if wants_msgpack():
+            # Starlette sets Content-Type from media_type after rendering
+            self.media_type = MSGPACK_MEDIA_TYPE
+            return msgpack.packb(content, default=to_jsonable)
+        return super().render(content)
+
+class ContentNegotiationMiddleware:
+    """Records the negotiated body format for NegotiatedResponse to use"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or msgpack is None:
+            await self.app(scope, receive, send)
+            return
+
+        token = _wants_msgpack.set(prefers_msgpack(Headers(scope=scope).get("accept", "")))
+
+        async def send_with_vary(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).add_vary_header("Accept")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_vary)
+        finally:
+            _wants_msgpack.reset(token)
@@ -0,0 +1,244 @@
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import List, Optional
+import anyio
+from sqlalchemy import event
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Request profiling configuration (opt-in)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+# Fraction of requests profiled regardless of latency
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# Requests at least this slow are always written out; 0 disables
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "1000"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+PROFILE_MAX_STATEMENTS = int(os.getenv("PROFILE_MAX_STATEMENTS", "500"))
+
+# Stack samples older than this can't belong to a request still being tracked
+SAMPLE_BUFFER_SECONDS = 120
+MAX_STACK_DEPTH = 64
+PROFILE_NAME = re.compile(r"^\d+-\d+-(\d+)ms-[A-Z]+-[\w.-]*\.json$")
+
+# SQL statements of the current request, or None when it isn't tracked
+_statements: ContextVar[Optional[list]] = ContextVar("profile_statements", default=None)
+
+class StackSampler:
+    """
+    Background thread that records the stacks of every thread at a fixed interval.
+
+    It only runs while at least one tracked request is in flight. Samples go
+    into a ring buffer with their timestamp, so a request that turns out to
+    be slow can collect what every thread (the event loop, the database
+    threadpool) was doing while it ran.
+    """
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self._samples = deque(maxlen=int(SAMPLE_BUFFER_SECONDS / self.interval))
+        self._active = 0
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def acquire(self):
+        with self._lock:
+            self._active += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+            self._wake.set()
+
+    def release(self):
+        with self._lock:
+            self._active -= 1
+            if self._active == 0:
+                self._wake.clear()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while True:
+            self._wake.wait()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            now = time.perf_counter()
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append((frame.f_code, frame.f_lineno))
+                    frame = frame.f_back
+                # Idle pool threads waiting for work are noise
+                code = stack[0][0] if stack else None
+                if code is not None and code.co_name == "wait" and code.co_filename.endswith("threading.py"):
+                    continue
+                self._samples.append((now, names.get(ident, str(ident)), tuple(stack)))
+            time.sleep(self.interval)
+
+    def collapsed_stacks(self, start: float, end: float) -> List[dict]:
+        """Samples taken between `start` and `end` (perf_counter) as collapsed stacks, most frequent first"""
+        counts = Counter()
+        for taken_at, thread_name, stack in list(self._samples):
+            if start <= taken_at <= end:
+                counts[(thread_name, stack)] += 1
+        return [
+            {"stack": ";".join([thread_name] + [_frame_name(code, line) for code, line in reversed(stack)]),
+             "samples": count}
+            for (thread_name, stack), count in counts.most_common()
+        ]
+
+def _frame_name(code, lineno: int) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{lineno})"
+
+sampler = StackSampler()
+
+# -- SQL capture ------------------------------------------------------------
+
+def instrument_engine(engine):
+    """Record each statement and its duration on the tracked request; only when profiling is on"""
+    if not PROFILING_ENABLED:
+        return
+    sync_engine = engine.sync_engine if hasattr(engine, "sync_engine") else engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _statements.get() is not None:
+            conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements = _statements.get()
+        if statements is None:
+            return
+        duration_ms = (time.perf_counter() - conn.info["profile_query_start"].pop()) * 1000
+        if len(statements) < PROFILE_MAX_STATEMENTS:
+            # Parameters are left out: they can hold password hashes and emails
+            statements.append({"statement": statement, "duration_ms": round(duration_ms, 3)})
+        else:
+            statements.append(None)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        if _statements.get() is not None and context.connection is not None:
+            starts = context.connection.info.get("profile_query_start")
+            if starts:
+                starts.pop()
+
+# -- Profile files ----------------------------------------------------------
+
+def write_profile(profile: dict, directory: str = PROFILE_DIR, max_files: int = PROFILE_MAX_FILES) -> str:
+    """Write one profile and delete the oldest files beyond `max_files`; returns the file name"""
+    os.makedirs(directory, exist_ok=True)
+    slug = re.sub(r"[^\w.-]+", "_", profile["path"].strip("/"))[:60]
+    name = f"{int(time.time() * 1000)}-{os.getpid()}-{int(profile['duration_ms'])}ms-{profile['method']}-{slug}.json"
+    tmp_path = os.path.join(directory, "." + name)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f)
+    os.replace(tmp_path, os.path.join(directory, name))
+
+    names = sorted(n for n in os.listdir(directory) if PROFILE_NAME.match(n))
+    for old in names[:max(0, len(names) - max_files)]:
+        try:
+            os.remove(os.path.join(directory, old))
+        except FileNotFoundError:
+            pass  # another worker got there first
+    return name
+
+def list_slow_requests(limit: int = 20, directory: str = PROFILE_DIR) -> List[dict]:
+    """Summaries of the slowest profiles on disk, from every worker, slowest first"""
+    if not os.path.isdir(directory):
+        return []
+    named = []
+    for name in os.listdir(directory):
+        match = PROFILE_NAME.match(name)
+        if match:
+            named.append((int(match.group(1)), name))
+    summaries = []
+    for _, name in sorted(named, reverse=True)[:limit]:
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                profile = json.load(f)
+        except (OSError, ValueError):
+            continue  # rotated away or half-written
+        summaries.append({
+            "file": name,
+            **{key: profile.get(key) for key in (
+                "method", "path", "status", "duration_ms", "started_at", "reason", "sql_count", "sql_total_ms"
+            )},
+            "top_stacks": profile.get("stacks", [])[:3],
+        })
+    return summaries
+
+# -- Middleware -------------------------------------------------------------
+
+class ProfilingMiddleware:
+    """
+    Profiles a random `sample_rate` of requests, plus any request slower than `slow_ms`.
+
+    Every request is tracked (statements collected, stack sampler running)
+    because slowness is only known at the end; only sampled or slow ones are
+    written to PROFILE_DIR. Add it last so it wraps the other middleware.
+    """
+
+    def __init__(self, app, sample_rate: float = PROFILE_SAMPLE_RATE, slow_ms: float = PROFILE_SLOW_MS):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        sampled = scope["type"] == "http" and random.random() < self.sample_rate
+        if scope["type"] != "http" or (not sampled and self.slow_ms <= 0):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        statements = []
+        token = _statements.set(statements)
+        sampler.acquire()
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            end = time.perf_counter()
+            sampler.release()
+            _statements.reset(token)
+
+            duration_ms = (end - start) * 1000
+            slow = 0 < self.slow_ms <= duration_ms
+            if sampled or slow:
+                captured = [s for s in statements if s is not None]
+                profile = {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "duration_ms": round(duration_ms, 3),
+                    "started_at": started_at,
+                    "reason": "slow" if slow else "sampled",
+                    "sql_count": len(statements),
+                    "sql_total_ms": round(sum(s["duration_ms"] for s in captured), 3),
+                    "sql": captured,
+                    "interval_ms": sampler.interval * 1000,
+                    "stacks": sampler.collapsed_stacks(start, end),
+                }
+                try:
+                    await anyio.to_thread.run_sync(write_profile, profile)
+                except OSError as e:
+                    print(f"⚠️ Failed to write request profile: {e}")
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import QuestionSet
+from utils.fast_json import dumps
+from dotenv import load_dotenv
+
+load_dotenv()
+
+QUESTION_SET_CACHE_SIZE = int(os.getenv("QUESTION_SET_CACHE_SIZE", "1024"))
+
+def canonical_questions_json(questions) -> str:
+    """Stable JSON encoding so identical question sets hash identically"""
+    return dumps(questions, sort_keys=True)
+
+def content_hash(canonical_json: str) -> str:
+    return hashlib.sha256(canonical_json.encode("utf-8")).hexdigest()
+
+class QuestionSetIdCache:
+    """
+    Bounded LRU of content hash -> question set id.
+
+    Question sets never change once written, so a hot set can be attached to
+    a new attempt without looking it up again.
+    """
+
+    def __init__(self, max_size: int = QUESTION_SET_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, digest: str) -> Optional[int]:
+        with self._lock:
+            set_id = self._entries.get(digest)
+            if set_id is not None:
+                self._entries.move_to_end(digest)
+            return set_id
+
+    def set(self, digest: str, set_id: int):
+        with self._lock:
+            self._entries[digest] = set_id
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+question_set_cache = QuestionSetIdCache()
+
+def get_or_create_question_set_id(db: Session, questions) -> int:
+    """Return the id of the shared QuestionSet for these questions, inserting it if new"""
+    canonical = canonical_questions_json(questions)
+    digest = content_hash(canonical)
+
+    cached_id = question_set_cache.get(digest)
+    if cached_id is not None:
+        return cached_id
+
+    set_id = db.scalar(select(QuestionSet.id).where(QuestionSet.content_hash == digest))
+    if set_id is None:
+        try:
+            with db.begin_nested():
+                question_set = QuestionSet(content_hash=digest, questions_data=canonical)
+                db.add(question_set)
+            # Not cached until seen again: this insert may still be rolled back
+            return question_set.id
+        except IntegrityError:
+            # A concurrent request stored the same set first
+            set_id = db.scalar(select(QuestionSet.id).where(QuestionSet.content_hash == digest))
+
+    question_set_cache.set(digest, set_id)
+    return set_id
@@ -0,0 +1,182 @@
+from typing import Optional
+from sqlalchemy import case, func, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import QuizAttempt, UserQuizStats, User
+from quiz_models import QuizStatsResponse, QuizStatus
+
+COMPLETED = QuizStatus.COMPLETED.value
+
+def compute_user_stats(db: Session, user_id: int) -> dict:
+    """Aggregate a user's quiz attempts from scratch in a single query"""
+    completed = QuizAttempt.status == COMPLETED
+    row = db.query(
+        func.count(QuizAttempt.id),
+        func.sum(case((completed, 1), else_=0)),
+        func.sum(case((completed, QuizAttempt.score))),
+        func.count(case((completed, QuizAttempt.score))),
+        func.sum(case((completed, QuizAttempt.percentage))),
+        func.count(case((completed, QuizAttempt.percentage))),
+        func.max(case((completed, QuizAttempt.score))),
+        func.min(case((completed, QuizAttempt.score)))
+    ).filter(
+        QuizAttempt.user_id == user_id
+    ).one()
+
+    return {
+        "total_quizzes": row[0] or 0,
+        "completed_quizzes": int(row[1] or 0),
+        "score_sum": int(row[2] or 0),
+        "score_count": row[3] or 0,
+        "percentage_sum": float(row[4] or 0),
+        "percentage_count": row[5] or 0,
+        "highest_score": row[6],
+        "lowest_score": row[7],
+    }
+
+def rebuild_user_stats(db: Session, user_id: int) -> UserQuizStats:
+    """Recompute one user's stats row from quiz_attempts (within the caller's transaction)"""
+    db.flush()
+    values = compute_user_stats(db, user_id)
+
+    stats = db.get(UserQuizStats, user_id, populate_existing=True)
+    if stats is None:
+        try:
+            with db.begin_nested():
+                stats = UserQuizStats(user_id=user_id, data_version=1, **values)
+                db.add(stats)
+            return stats
+        except IntegrityError:
+            # Another request created the row first; overwrite it below
+            stats = db.get(UserQuizStats, user_id, populate_existing=True)
+
+    for key, value in values.items():
+        setattr(stats, key, value)
+    stats.data_version = (stats.data_version or 0) + 1
+    db.flush()
+    return stats
+
+def rebuild_all_stats(db: Session, batch_size: int = 500) -> int:
+    """Recompute the stats table for every user, committing per batch; returns users processed"""
+    processed = 0
+    last_id = 0
+    while True:
+        user_ids = [
+            row[0] for row in db.query(User.id).filter(User.id > last_id).order_by(User.id).limit(batch_size)
+        ]
+        if not user_ids:
+            break
+        for user_id in user_ids:
+            rebuild_user_stats(db, user_id)
+        db.commit()
+        processed += len(user_ids)
+        last_id = user_ids[-1]
+    return processed
+
+def _apply(db: Session, user_id: int, values: dict):
+    """Apply an in-place UPDATE to a stats row, building the row if it doesn't exist yet"""
+    s = UserQuizStats
+    result = db.execute(
+        update(s)
+        .where(s.user_id == user_id)
+        .values({**values, s.data_version: func.coalesce(s.data_version, 0) + 1})
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        # First write for this user: backfill from their full history,
+        # which already includes the attempt flushed by the caller
+        rebuild_user_stats(db, user_id)
+
+def _score_values(score: Optional[int], percentage: Optional[float]) -> dict:
+    """Column updates adding one completed score"""
+    s = UserQuizStats
+    values = {}
+    if score is not None:
+        values.update({
+            s.score_sum: s.score_sum + score,
+            s.score_count: s.score_count + 1,
+            s.highest_score: case((or_(s.highest_score.is_(None), s.highest_score < score), score), else_=s.highest_score),
+            s.lowest_score: case((or_(s.lowest_score.is_(None), s.lowest_score > score), score), else_=s.lowest_score),
+        })
+    if percentage is not None:
+        values.update({
+            s.percentage_sum: s.percentage_sum + percentage,
+            s.percentage_count: s.percentage_count + 1,
+        })
+    return values
+
+def record_attempt_created(
+    db: Session,
+    user_id: int,
+    status: str,
+    score: Optional[int] = None,
+    percentage: Optional[float] = None
+):
+    """Account for a newly inserted attempt (call after flushing it, before commit)"""
+    s = UserQuizStats
+    values = {s.total_quizzes: s.total_quizzes + 1}
+    if status == COMPLETED:
+        values[s.completed_quizzes] = s.completed_quizzes + 1
+        values.update(_score_values(score, percentage))
+    db.flush()
+    _apply(db, user_id, values)
+
+def record_attempt_completed(
+    db: Session,
+    user_id: int,
+    previous_status: str,
+    previous_score: Optional[int],
+    previous_percentage: Optional[float],
+    score: Optional[int],
+    percentage: Optional[float]
+):
+    """Account for an attempt being completed, or re-completed on a retake"""
+    db.flush()
+    s = UserQuizStats
+
+    if previous_status != COMPLETED:
+        values = {s.completed_quizzes: s.completed_quizzes + 1}
+        values.update(_score_values(score, percentage))
+        _apply(db, user_id, values)
+        return
+
+    # Retake of an already completed attempt: swap the old score for the new
+    # one. If the old score was the min or max we can't know the runner-up
+    # without rescanning, so rebuild this user's row instead.
+    stats = db.get(UserQuizStats, user_id, populate_existing=True)
+    if stats is None or previous_score is None or previous_score in (stats.highest_score, stats.lowest_score):
+        rebuild_user_stats(db, user_id)
+        return
+
+    values = _score_values(score, percentage)
+    values[s.score_sum] = s.score_sum - previous_score + (score or 0)
+    values[s.score_count] = s.score_count - 1 + (1 if score is not None else 0)
+    if previous_percentage is not None:
+        values[s.percentage_sum] = s.percentage_sum - previous_percentage + (percentage or 0)
+        values[s.percentage_count] = s.percentage_count - 1 + (1 if percentage is not None else 0)
+    _apply(db, user_id, values)
+
+def get_user_stats(db: Session, user_id: int) -> UserQuizStats:
+    """Primary-key lookup of a user's stats, backfilling the row on first use"""
+    stats = db.get(UserQuizStats, user_id)
+    if stats is None:
+        if db.info.get("read_only"):
+            # Can't write on a replica: answer from the aggregate and leave the
+            # backfill to the user's next quiz write on the primary
+            return UserQuizStats(user_id=user_id, **compute_user_stats(db, user_id))
+        stats = rebuild_user_stats(db, user_id)
+        db.commit()
+    return stats
+
+def to_stats_response(stats: UserQuizStats) -> QuizStatsResponse:
+    average_score = stats.score_sum / stats.score_count if stats.score_count else 0
+    average_percentage = stats.percentage_sum / stats.percentage_count if stats.percentage_count else 0
+    return QuizStatsResponse(
+        total_quizzes=stats.total_quizzes,
+        completed_quizzes=stats.completed_quizzes,
+        incomplete_quizzes=stats.total_quizzes - stats.completed_quizzes,
+        average_score=round(average_score, 2),
+        highest_score=stats.highest_score or 0,
+        lowest_score=stats.lowest_score or 0,
+        average_percentage=round(average_percentage, 2)
+    )
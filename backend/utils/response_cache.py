@@ -0,0 +1,86 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Completed quiz response cache configuration
+QUIZ_RESPONSE_CACHE_BYTES = int(os.getenv("QUIZ_RESPONSE_CACHE_BYTES", str(32 * 1024 * 1024)))
+# A retake re-completes an attempt; other processes pick that up after this long
+QUIZ_RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("QUIZ_RESPONSE_CACHE_TTL_SECONDS", "300"))
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+class ResponseCache:
+    """
+    LRU of pre-serialized response bodies, bounded by their total size.
+
+    Stores (etag, body) so a hit is returned as-is, without a query or a
+    pydantic round trip. Bodies larger than the whole budget are not cached.
+    """
+
+    def __init__(self, max_bytes: int = QUIZ_RESPONSE_CACHE_BYTES, ttl: float = QUIZ_RESPONSE_CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[2] > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def set(self, key: Hashable, body: bytes) -> str:
+        """Cache a body and return its strong ETag"""
+        etag = strong_etag(body)
+        if len(body) > self.max_bytes:
+            return etag
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (etag, body, time.monotonic())
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+        return etag
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+# Completed quiz attempts, keyed by (user_id, quiz_id)
+quiz_response_cache = ResponseCache()
@@ -0,0 +1,218 @@
+import csv
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from database import User
+from auth_models import UserRegister
+from utils.auth_utils import get_password_hash
+from utils.login_guard import LOGIN_MAX_CONCURRENT_VERIFICATIONS
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_BATCH_SIZE = 500
+
+# Upload limits for the admin import endpoint (the CLI has none)
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(5 * 1024 * 1024)))
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "10000"))
+# Threads hashing uploaded passwords inside the API; bcrypt releases the GIL.
+# Logins are capped at LOGIN_MAX_CONCURRENT_VERIFICATIONS hashes at once and
+# that cap is sized to the CPUs, so by default an import takes at most half
+# of it and a large upload can't starve logins of CPU
+IMPORT_HASH_THREADS = int(os.getenv(
+    "IMPORT_HASH_THREADS", str(max(1, LOGIN_MAX_CONCURRENT_VERIFICATIONS // 2))
+))
+
+_hash_executor = None
+
+def parse_users(content: str, fmt: Optional[str] = None) -> List[dict]:
+    """
+    Parse users from CSV (with a header row) or NDJSON (one object per line).
+
+    If no format is given it is sniffed from the first non-blank character.
+    """
+    if fmt is None:
+        fmt = "ndjson" if content.lstrip().startswith("{") else "csv"
+
+    if fmt == "csv":
+        return [dict(row) for row in csv.DictReader(io.StringIO(content))]
+
+    if fmt == "ndjson":
+        rows = []
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            # Bad lines are kept so they are reported against their row number
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                row = {"_error": f"Invalid JSON: {e.msg}"}
+            if not isinstance(row, dict):
+                row = {"_error": "Each line must be a JSON object"}
+            rows.append(row)
+        return rows
+
+    raise ValueError(f"Unsupported format: {fmt}")
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    """Shared thread pool for hashing in the API process, created on first use"""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(max_workers=IMPORT_HASH_THREADS, thread_name_prefix="import-hash")
+    return _hash_executor
+
+def hash_passwords(passwords: List[str], workers: Optional[int] = None, use_threads: bool = False) -> List[str]:
+    """
+    Hash passwords in parallel, preserving order.
+
+    The CLI uses a process pool of `workers`. The API passes `use_threads`
+    and uses the shared thread pool, because forking the server process
+    (engines, pools and all) on every request is far too expensive.
+    """
+    if not passwords:
+        return []
+    if use_threads:
+        return list(_get_hash_executor().map(get_password_hash, passwords))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(passwords) == 1:
+        return [get_password_hash(p) for p in passwords]
+
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(get_password_hash, passwords, chunksize=chunksize))
+
+def _result(row: int, username: Optional[str], status: str, detail: Optional[str] = None) -> dict:
+    return {"row": row, "username": username, "status": status, "detail": detail}
+
+def _validate_rows(rows: List[dict]) -> Tuple[List[dict], Dict[int, dict]]:
+    """Validate rows and drop duplicates within the file; returns (valid users, failures by row)"""
+    valid = []
+    failures = {}
+    seen_usernames = set()
+    seen_emails = set()
+
+    for index, raw in enumerate(rows, start=1):
+        if "_error" in raw:
+            failures[index] = _result(index, None, "invalid", raw["_error"])
+            continue
+        try:
+            user = UserRegister(**raw)
+        except (ValidationError, TypeError):
+            failures[index] = _result(index, raw.get("username"), "invalid", "username, email and password are required")
+            continue
+
+        if not user.validate_email_format():
+            failures[index] = _result(index, user.username, "invalid", "Invalid email format")
+            continue
+        password_valid, password_message = user.validate_password()
+        if not password_valid:
+            failures[index] = _result(index, user.username, "invalid", password_message)
+            continue
+
+        if user.username in seen_usernames:
+            failures[index] = _result(index, user.username, "conflict", "Duplicate username in file")
+            continue
+        if user.email in seen_emails:
+            failures[index] = _result(index, user.username, "conflict", "Duplicate email in file")
+            continue
+        seen_usernames.add(user.username)
+        seen_emails.add(user.email)
+        valid.append({"row": index, "user": user})
+
+    return valid, failures
+
+def _existing(db: Session, users: List[dict]) -> Tuple[set, set]:
+    """Return usernames and emails from this batch that are already registered"""
+    usernames = [u["user"].username for u in users]
+    emails = [u["user"].email for u in users]
+    taken_usernames = set(db.scalars(select(User.username).where(User.username.in_(usernames))))
+    taken_emails = set(db.scalars(select(User.email).where(User.email.in_(emails))))
+    return taken_usernames, taken_emails
+
+def _insert_one_by_one(db: Session, batch: List[dict], results: Dict[int, dict]):
+    """Fallback when a batch loses a race with another writer: attribute the conflict per row"""
+    for item in batch:
+        user = item["user"]
+        try:
+            with db.begin_nested():
+                db.execute(insert(User), [{
+                    "username": user.username,
+                    "email": user.email,
+                    "hashed_password": item["hashed_password"]
+                }])
+            results[item["row"]] = _result(item["row"], user.username, "created")
+        except IntegrityError:
+            results[item["row"]] = _result(item["row"], user.username, "conflict", "User with this username or email already exists")
+
+def import_users(
+    db: Session,
+    rows: List[dict],
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False,
+    use_threads: bool = False
+) -> dict:
+    """
+    Validate, hash and insert users in batches.
+
+    Every input row gets a result with status "created", "conflict" or
+    "invalid" (or "valid" on a dry run) instead of failing the whole import.
+    """
+    valid, results = _validate_rows(rows)
+
+    # Drop rows clashing with existing users before spending CPU on hashing
+    pending = []
+    for start in range(0, len(valid), batch_size):
+        batch = valid[start:start + batch_size]
+        taken_usernames, taken_emails = _existing(db, batch)
+        for item in batch:
+            user = item["user"]
+            if user.username in taken_usernames:
+                results[item["row"]] = _result(item["row"], user.username, "conflict", "Username already registered")
+            elif user.email in taken_emails:
+                results[item["row"]] = _result(item["row"], user.username, "conflict", "Email already registered")
+            else:
+                pending.append(item)
+
+    if dry_run:
+        for item in pending:
+            results[item["row"]] = _result(item["row"], item["user"].username, "valid")
+    else:
+        hashes = hash_passwords([item["user"].password for item in pending], workers, use_threads)
+        for item, hashed_password in zip(pending, hashes):
+            item["hashed_password"] = hashed_password
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            try:
+                db.execute(insert(User), [
+                    {
+                        "username": item["user"].username,
+                        "email": item["user"].email,
+                        "hashed_password": item["hashed_password"]
+                    }
+                    for item in batch
+                ])
+                db.commit()
+                for item in batch:
+                    results[item["row"]] = _result(item["row"], item["user"].username, "created")
+            except IntegrityError:
+                db.rollback()
+                _insert_one_by_one(db, batch, results)
+                db.commit()
+
+    ordered = [results[row] for row in sorted(results)]
+    created = sum(1 for r in ordered if r["status"] in ("created", "valid"))
+    return {
+        "total": len(rows),
+        "created": created,
+        "failed": len(ordered) - created,
+        "dry_run": dry_run,
+        "results": ordered
+    }
@@ -20,6 +20,8 @@ import './Dashboard.css';
 const Dashboard = ({ onNavigateToQuiz, onResumeQuiz }) => {
   const [stats, setStats] = useState(null);
   const [recentQuizzes, setRecentQuizzes] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
 
@@ -64,6 +66,7 @@ const Dashboard = ({ onNavigateToQuiz, onResumeQuiz }) => {
       
       setStats(data.stats);
       setRecentQuizzes(data.quizzes);
+      setNextCursor(data.next_cursor);
     } catch (err) {
       console.error('Dashboard fetch error:', err);
       
@@ -160,6 +163,32 @@ const Dashboard = ({ onNavigateToQuiz, onResumeQuiz }) => {
     return '#dc3545';
   };
 
+  const loadMoreQuizzes = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const response = await fetch(
+        `http://127.0.0.1:8000/api/quiz/recent?cursor=${encodeURIComponent(nextCursor)}`,
+        {
+          headers: {
+            'Authorization': `Bearer ${token}`,
+            'Content-Type': 'application/json',
+          },
+        }
+      );
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+      }
+      const data = await response.json();
+      setRecentQuizzes((previous) => [...previous, ...data.quizzes]);
+      setNextCursor(data.next_cursor);
+    } catch (err) {
+      console.error('Failed to load more quizzes:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleResumeQuiz = async (quizId) => {
     try {
       console.log('=== RESUME QUIZ DEBUG ===');
@@ -479,6 +508,15 @@ const Dashboard = ({ onNavigateToQuiz, onResumeQuiz }) => {
                 </div>
               </div>
             ))}
+            {nextCursor && (
+              <button
+                onClick={loadMoreQuizzes}
+                className="retry-btn load-more-btn"
+                disabled={loadingMore}
+              >
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            )}
           </div>
         ) : (
           <div className="no-quizzes">
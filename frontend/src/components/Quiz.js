@@ -2,6 +2,13 @@ import React, { useState, useEffect } from 'react';
 import { useAuth } from '../contexts/AuthContext';
 import './Quiz.css';
 
+// One key per quiz run: retries and double submits of the same result
+// reuse it, so the server returns the original attempt instead of a new one
+const newIdempotencyKey = () =>
+  (window.crypto && window.crypto.randomUUID)
+    ? window.crypto.randomUUID()
+    : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+
 const Quiz = ({ questions, topic, onBackToForm, onBackToDashboard }) => {
   const [currentQuestion, setCurrentQuestion] = useState(0);
   const [selectedAnswers, setSelectedAnswers] = useState({});
@@ -9,6 +16,7 @@ const Quiz = ({ questions, topic, onBackToForm, onBackToDashboard }) => {
   const [score, setScore] = useState(0);
   const [quizAttemptId, setQuizAttemptId] = useState(null);
   const [isRetake, setIsRetake] = useState(false);
+  const [idempotencyKey, setIdempotencyKey] = useState(newIdempotencyKey);
   
   const { token } = useAuth();
 
@@ -100,6 +108,7 @@ const Quiz = ({ questions, topic, onBackToForm, onBackToDashboard }) => {
           headers: {
             'Authorization': `Bearer ${token}`,
             'Content-Type': 'application/json',
+            'Idempotency-Key': idempotencyKey,
           },
           body: JSON.stringify({
             answers: userAnswers,
@@ -117,6 +126,7 @@ const Quiz = ({ questions, topic, onBackToForm, onBackToDashboard }) => {
           headers: {
             'Authorization': `Bearer ${token}`,
             'Content-Type': 'application/json',
+            'Idempotency-Key': idempotencyKey,
           },
           body: JSON.stringify({
             topic: topic,
@@ -131,6 +141,8 @@ const Quiz = ({ questions, topic, onBackToForm, onBackToDashboard }) => {
         if (response.ok) {
           const data = await response.json();
           console.log('✅ Created new completed quiz with ID:', data.id);
+          // Retakes complete this attempt again instead of creating another
+          setQuizAttemptId(data.id);
         }
       }
     } catch (error) {
@@ -146,6 +158,7 @@ const Quiz = ({ questions, topic, onBackToForm, onBackToDashboard }) => {
     setShowResults(false);
     setScore(0);
     setIsRetake(true);
+    setIdempotencyKey(newIdempotencyKey());
     // Don't create a new quiz attempt for retake - reuse the current one
     console.log('🔄 Retaking quiz - reusing existing quiz attempt ID:', quizAttemptId);
   };